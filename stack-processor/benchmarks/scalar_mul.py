@@ -0,0 +1,40 @@
+"""
+Compare the cost of the Montgomery ladder with the variable-time scalar
+multiplications. Run from the stack-processor directory:
+
+    python -m benchmarks.scalar_mul
+"""
+
+import secrets
+import timeit
+from stack_processor.ecdsa.curveparam import secp256r1
+from stack_processor.ecdsa.curvepoint import CurvePoint, precompute_basepoint
+from stack_processor.ecdsa.ecdsa import ECDSA
+from stack_processor.hashes import sha256
+
+
+def bench(label: str, func, number: int, baseline: float = 0.0) -> float:
+    per_call = min(timeit.repeat(func, number=number, repeat=3)) / number
+    relative = f"  ({per_call / baseline:.2f}x)" if baseline else ""
+    print(f"{label:<40}{per_call * 1000:8.3f} ms{relative}")
+    return per_call
+
+
+if __name__ == "__main__":
+    precompute_basepoint(secp256r1)
+    G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+    P = secrets.randbelow(secp256r1.n) * G
+    k = secrets.randbelow(secp256r1.n - 1) + 1
+
+    print("Scalar multiplication")
+    fixed = bench("k * G (fixed-base table)", lambda: k * G, 200)
+    bench("G.mul_ladder(k)", lambda: G.mul_ladder(k), 20, fixed)
+    variable = bench("k * P (wNAF)", lambda: k * P, 50)
+    bench("P.mul_ladder(k)", lambda: P.mul_ladder(k), 20, variable)
+
+    print("Signing")
+    fast = ECDSA(secp256r1, sha256)
+    ladder = ECDSA(secp256r1, sha256, (fast.d_U, fast.Q_U), ladder=True)
+    message = b"benchmark"
+    baseline = bench("create_sign", lambda: fast.create_sign(message), 100)
+    bench("create_sign, ladder=True", lambda: ladder.create_sign(message), 20, baseline)
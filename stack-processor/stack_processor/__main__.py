@@ -1,7 +1,17 @@
 import argparse
+import json
+import sys
+from .batch import BatchRunner, read_scripts, result_to_json
+from .hashes import DigestCache
 from .processor import StackProcessor
+from .profiling import ExecutionStats
+from .script_cache import ScriptCache
+from .server import main as server_main
 
 if __name__ == "__main__":
+    if sys.argv[1:2] in (["serve"], ["loadgen"]):
+        server_main(sys.argv[1:])
+        sys.exit()
     parser = argparse.ArgumentParser(
         description="Stack processor powered by Team Crypt0newbies"
     )
@@ -9,10 +19,85 @@ if __name__ == "__main__":
     parser.add_argument(
         "--verbose", action="store_true", help="output intermediate stack contents"
     )
+    parser.add_argument(
+        "--script-cache",
+        metavar="DIR",
+        help="reuse compiled programs stored in this directory",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="run every script of a JSON lines file or a directory of program"
+        " files, printing one JSON result per line",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="number of worker processes in batch mode"
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="print batch results as they complete instead of in input order",
+    )
+    parser.add_argument(
+        "--deferred",
+        action="store_true",
+        help="verify the signatures of every batch chunk at once",
+    )
+    parser.add_argument(
+        "--budget", type=int, help="abort scripts whose cost exceeds this budget"
+    )
+    parser.add_argument(
+        "--digest-cache",
+        type=int,
+        default=0,
+        metavar="SIZE",
+        help="number of OP_HASH digests to cache, per worker in batch mode",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write per-opcode execution statistics as JSON to stderr",
+    )
     args = parser.parse_args()
-    data = []
-    with open(args.filepath) as f:
-        for line in f:
-            data.append(line.strip())
-    processor = StackProcessor(data, verbose=args.verbose)
-    print(processor.run())
+    if args.batch and args.profile:
+        parser.error("--profile cannot be used with --batch")
+    if not args.batch:
+        batch_only = {
+            "--jobs": args.jobs is not None,
+            "--unordered": args.unordered,
+            "--deferred": args.deferred,
+        }
+        for flag, given in batch_only.items():
+            if given:
+                parser.error(f"{flag} can only be used with --batch")
+    if args.batch:
+        with BatchRunner(
+            max_workers=args.jobs,
+            cache_dir=args.script_cache,
+            deferred=args.deferred,
+            budget=args.budget,
+            digest_cache_size=args.digest_cache,
+        ) as runner:
+            scripts = read_scripts(args.filepath)
+            for result in runner.run(scripts, ordered=not args.unordered):
+                print(result_to_json(result), flush=True)
+    else:
+        with open(args.filepath) as f:
+            if args.script_cache is None:
+                data = f
+            else:
+                tokens = [line.strip() for line in f]
+                data = ScriptCache(maxsize=1, directory=args.script_cache).get(tokens)
+            stats = ExecutionStats() if args.profile else None
+            digests = DigestCache(args.digest_cache) if args.digest_cache else None
+            processor = StackProcessor(
+                data,
+                verbose=args.verbose,
+                profile=stats,
+                budget=args.budget,
+                digest_cache=digests,
+            )
+            print(processor.run())
+        if stats is not None:
+            json.dump(stats.to_dict(), sys.stderr, indent=2)
+            print(file=sys.stderr)
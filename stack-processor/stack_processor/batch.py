@@ -0,0 +1,314 @@
+from base64 import b64encode
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from .hashes import DigestCache, lsh256
+from .ecdsa.curveparam import secp256r1
+from .ecdsa.curvepoint import precompute_basepoint
+from .processor import StackProcessor, pubkey_cache
+from .script_cache import ScriptCache
+from .verification import _chunks, _resolve, _substitute
+import json
+import os
+
+# A script to run in a batch: (identifier, tokens).
+Script = Tuple[str, List[str]]
+
+
+class BatchResult(NamedTuple):
+    # Identifier of the script.
+    id: str
+    # Final stack, or None when the script raised.
+    stack: Optional[List[Any]]
+    # Description of the exception the script raised, if any.
+    error: Optional[str] = None
+    # Cost the script consumed, including the instruction that exceeded the
+    # budget, if any.
+    cost: Optional[int] = None
+
+
+# Per-process compiled script cache, hash function, cost budget and digest
+# cache, set up once by _init_worker in every worker.
+_worker_scripts: Optional[ScriptCache] = None
+_worker_hash_func: Callable = lsh256
+_worker_budget: Optional[int] = None
+_worker_digests: Optional[DigestCache] = None
+
+
+def _init_worker(
+    hash_func: Callable,
+    cache_dir: Optional[str],
+    budget: Optional[int] = None,
+    digest_cache_size: int = 0,
+) -> None:
+    """
+    Set up the script cache of a worker process and warm its curve tables.
+
+    :param hash_func: Hash function OP_HASH and OP_CheckSig use.
+    :param cache_dir: Optional. Directory of the on-disk script cache.
+    :param budget: Optional. Cost budget of every script.
+    :param digest_cache_size: Optional. Number of OP_HASH digests to cache,
+    0 to disable the cache.
+    """
+    global _worker_scripts, _worker_hash_func, _worker_budget, _worker_digests
+    _worker_scripts = ScriptCache(directory=cache_dir)
+    _worker_hash_func = hash_func
+    _worker_budget = budget
+    _worker_digests = DigestCache(digest_cache_size) if digest_cache_size else None
+    precompute_basepoint(secp256r1)
+
+
+def _portable(item: Any) -> Any:
+    """
+    Convert a stack item into a value that can be sent between processes.
+
+    :param item: Stack item.
+    :returns: The item, with DER public keys replaced by their encoding.
+    """
+    if type(item) == StackProcessor.PubkeyDER:
+        return item.dump()
+    return item
+
+
+def _run_script(script: Script, deferred: bool) -> BatchResult:
+    """
+    Run a single script of a batch.
+
+    :param script: Script to run.
+    :param deferred: Whether to defer its signature checks.
+    :returns: Result of the script, whose stack may hold placeholders of
+    deferred signature checks.
+    """
+    assert _worker_scripts is not None, "worker is not initialized"
+    name, data = script
+    try:
+        program = _worker_scripts.get(data)
+    except Exception as e:
+        return BatchResult(name, None, f"{type(e).__name__}: {e}")
+    processor = StackProcessor(
+        program,
+        _worker_hash_func,
+        deferred=deferred,
+        budget=_worker_budget,
+        digest_cache=_worker_digests,
+    )
+    try:
+        stack = processor.run()
+    except Exception as e:
+        return BatchResult(name, None, f"{type(e).__name__}: {e}", processor.cost)
+    return BatchResult(name, list(stack), None, processor.cost)
+
+
+def _run_chunk(scripts: List[Script], deferred: bool = False) -> List[BatchResult]:
+    """
+    Run a chunk of scripts inside a worker process.
+
+    :param scripts: Scripts to run.
+    :param deferred: Optional. Whether to verify the signatures of the whole
+    chunk in one batch after running the scripts.
+    :returns: Result of each script, in order.
+    """
+    results = [_run_script(script, deferred) for script in scripts]
+    finished = [i for i, result in enumerate(results) if result.stack is not None]
+    stacks = [results[i].stack for i in finished]
+    if deferred:
+        stacks = _resolve(stacks, hash_func=_worker_hash_func, pubkeys=pubkey_cache)
+    for i, stack in zip(finished, stacks):
+        try:
+            stack = _substitute(stack)
+        except Exception as e:
+            # Fail only the script whose check failed, as eager mode would.
+            results[i] = results[i]._replace(
+                stack=None, error=f"{type(e).__name__}: {e}"
+            )
+            continue
+        results[i] = results[i]._replace(stack=[_portable(item) for item in stack])
+    return results
+
+
+def read_jsonl(path: str) -> Iterator[Script]:
+    """
+    Read scripts from a JSON lines file. Every line is an object with the
+    tokens of the script in "script" and an optional identifier in "id".
+    Blank lines are skipped.
+
+    :param path: Path of the file.
+    :returns: Iterator over the scripts. Scripts without an identifier are
+    named after their line number.
+    :raises ValueError: ValueError is raised when a line is not a valid record.
+    """
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or not isinstance(
+                record.get("script"), list
+            ):
+                raise ValueError(f"{path}:{lineno}: expected a script record")
+            yield str(record.get("id", lineno)), record["script"]
+
+
+def read_directory(path: str) -> Iterator[Script]:
+    """
+    Read program files of a directory in name order. Every file holds one
+    token per line, as accepted by the command line interface.
+
+    :param path: Path of the directory.
+    :returns: Iterator over the scripts, named after their files.
+    """
+    for name in sorted(os.listdir(path)):
+        filepath = os.path.join(path, name)
+        if os.path.isfile(filepath):
+            with open(filepath) as f:
+                yield name, [line.strip() for line in f]
+
+
+def read_scripts(path: str) -> Iterator[Script]:
+    """
+    Read scripts from a directory of program files or a JSON lines file.
+
+    :param path: Path of the directory or file.
+    :returns: Iterator over the scripts.
+    """
+    if os.path.isdir(path):
+        return read_directory(path)
+    return read_jsonl(path)
+
+
+def result_to_dict(result: BatchResult) -> dict:
+    """
+    Convert a result into a JSON serializable dictionary. Byte strings are
+    written as base64: literals and signatures as [r, s] lists.
+
+    :param result: Result to convert.
+    :returns: Dictionary with the keys id, stack, error and cost.
+    """
+
+    def encode(item: Any) -> Any:
+        if isinstance(item, bytes):
+            return "base64:" + b64encode(item).decode("ascii")
+        if isinstance(item, tuple):
+            return list(item)
+        return item
+
+    stack = None if result.stack is None else [encode(item) for item in result.stack]
+    return {
+        "id": result.id,
+        "stack": stack,
+        "error": result.error,
+        "cost": result.cost,
+    }
+
+
+def result_to_json(result: BatchResult) -> str:
+    """
+    Encode a result as a JSON line, as converted by result_to_dict.
+
+    :param result: Result to encode.
+    :returns: Encoded result, without the trailing newline.
+    """
+    return json.dumps(result_to_dict(result))
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        hash_func: Callable = lsh256,
+        max_workers: Optional[int] = None,
+        chunksize: int = 16,
+        cache_dir: Optional[str] = None,
+        deferred: bool = False,
+        budget: Optional[int] = None,
+        digest_cache_size: int = 0,
+    ):
+        """
+        Initialize a pool of worker processes running stack programs.
+
+        Every worker imports the processor, builds the curve tables and keeps
+        its compiled scripts and decoded public keys once, so these costs are
+        shared by all scripts of a batch.
+
+        :param hash_func: Hash function OP_HASH and OP_CheckSig use. It must be
+        picklable.
+        :param max_workers: Optional. Number of worker processes. Defaults to
+        the number of CPUs.
+        :param chunksize: Number of scripts sent to a worker at once.
+        :param cache_dir: Optional. Directory of an on-disk script cache
+        shared by the workers.
+        :param deferred: Optional. Whether workers defer OP_CheckSig and verify
+        the signatures of every chunk in one batch.
+        :param budget: Optional. Cost budget of every script. Scripts exceeding
+        it fail with a BudgetExceeded error.
+        :param digest_cache_size: Optional. Number of OP_HASH digests every
+        worker caches, 0 to disable the cache.
+        """
+        self.chunksize = chunksize
+        self.deferred = deferred
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(hash_func, cache_dir, budget, digest_cache_size),
+        )
+
+    def run(
+        self, scripts: Iterable[Script], ordered: bool = True
+    ) -> Iterator[BatchResult]:
+        """
+        Run scripts, yielding results while the batch is still running. Only a
+        few chunks per worker are in flight at once, so arbitrarily long
+        inputs run in bounded memory.
+
+        :param scripts: Scripts (identifier, tokens) to run.
+        :param ordered: Optional. Whether to yield results in input order.
+        Otherwise chunks are yielded as they complete.
+        :returns: Iterator over the results.
+        """
+        chunks = _chunks(scripts, self.chunksize)
+        window = 2 * self.max_workers
+        pending: "deque[Future]" = deque()
+        for chunk in chunks:
+            pending.append(self._executor.submit(_run_chunk, chunk, self.deferred))
+            if len(pending) >= window:
+                yield from self._drain(pending, ordered)
+        while pending:
+            yield from self._drain(pending, ordered)
+
+    @staticmethod
+    def _drain(pending: "deque[Future]", ordered: bool) -> Iterator[BatchResult]:
+        """
+        Wait for in-flight chunks and yield the results of finished ones.
+
+        :param pending: Futures of the in-flight chunks, in submission order.
+        :param ordered: Whether to yield results in submission order.
+        :returns: Iterator over the results of at least one chunk.
+        """
+        if ordered:
+            yield from pending.popleft().result()
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield from future.result()
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self) -> "BatchRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
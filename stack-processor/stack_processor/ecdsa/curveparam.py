@@ -1,10 +1,34 @@
-from .data_conversion import octet_str_to_int, octet_str_to_point
+from typing import Dict, Tuple
+from .data_conversion import (
+    octet_str_to_int,
+    octet_str_to_point,
+    point_to_octets,
+)
+from .numbertheory import square_root
 
 
 class CurveParam:
-    def __init__(self, name: str, p: str, a: str, b: str, G: str, n: str, h: str):
+    __slots__ = (
+        "name",
+        "p",
+        "a",
+        "b",
+        "n",
+        "h",
+        "n_bitlen",
+        "sqrt",
+        "basepoint",
+        "params",
+    )
+
+    # Every distinct curve is created once; equal parameters give the same
+    # object, so points can compare curves by identity.
+    _interned: Dict[Tuple, "CurveParam"] = {}
+
+    def __new__(cls, name: str, p: str, a: str, b: str, G: str, n: str, h: str):
         """
-        Initialize a CurveParam object.
+        Get the CurveParam object for the given parameters, creating it if it
+        does not exist yet.
 
         :param p: An octet string representation of p specifying the field F_p.
         :param a: An octet string representation of the coeff. a of EC.
@@ -13,16 +37,59 @@ class CurveParam:
         :param n: An octet string representation of the group order n.
         :param h: An octet string representation of the cofactor h.
         """
-        self.name = name
-        self.params = {
+        params = {
             "p": octet_str_to_int(p),
             "a": octet_str_to_int(a),
             "b": octet_str_to_int(b),
             "n": octet_str_to_int(n),
             "h": octet_str_to_int(h),
         }
-        assert 4 * (self.params["a"] ** 3) + 27 * (self.params["b"] ** 2) != 0
-        self.basepoint = octet_str_to_point(G, self.params)
+        assert 4 * (params["a"] ** 3) + 27 * (params["b"] ** 2) != 0
+        sqrt = square_root(params["p"])
+        basepoint = octet_str_to_point(G, params, sqrt)
+        assert basepoint is not None, "basepoint is the point at infinity"
+        key = (name, *params.values(), basepoint)
+        curve = cls._interned.get(key)
+        if curve is not None:
+            return curve
+        curve = super().__new__(cls)
+        curve.name = name
+        curve.p = params["p"]
+        curve.a = params["a"]
+        curve.b = params["b"]
+        curve.n = params["n"]
+        curve.h = params["h"]
+        curve.n_bitlen = curve.n.bit_length()
+        curve.sqrt = sqrt
+        curve.basepoint = basepoint
+        curve.params = params
+        cls._interned[key] = curve
+        return curve
+
+    def __reduce__(self):
+        """
+        Pickle by parameters, so unpickling finds the interned object.
+        """
+        return (
+            CurveParam,
+            (
+                self.name,
+                f"{self.p:x}",
+                f"{self.a:x}",
+                f"{self.b:x}",
+                point_to_octets(self.basepoint, self.p, compressed=False).hex(),
+                f"{self.n:x}",
+                f"{self.h:x}",
+            ),
+        )
+
+    def __repr__(self) -> str:
+        """
+        Get a representation of the curve.
+
+        :returns: Representation in string.
+        """
+        return f"CurveParam({self.name!r})"
 
 
 secp256r1 = CurveParam(
@@ -1,15 +1,324 @@
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from .curveparam import CurveParam
 from .data_conversion import (
-    field_elem_to_octet_list,
-    octet_list_to_int,
+    Octets,
     octet_str_to_point,
+    octets_to_point,
+    point_to_octets,
 )
-from .numbertheory import inv_mod
-from math import floor, log2
+from .numbertheory import batch_inv_mod, inv_mod
+
+# Jacobian coordinates (X, Y, Z) represent the affine point (X/Z^2, Y/Z^3).
+# Any triple with Z == 0 is the point at infinity.
+_JACOBIAN_INFINITY = (1, 1, 0)
+
+
+def _jacobian_double(P: Tuple[int, int, int], a: int, p: int) -> Tuple[int, int, int]:
+    """
+    Double a point in Jacobian coordinates.
+
+    :param P: The point (X, Y, Z) to double.
+    :param a: Coefficient a of the curve.
+    :param p: Order of field F_p.
+    :returns: 2P in Jacobian coordinates.
+    """
+    X, Y, Z = P
+    if Z == 0 or Y == 0:
+        return _JACOBIAN_INFINITY
+    YY = Y * Y % p
+    S = 4 * X * YY % p
+    ZZ = Z * Z % p
+    M = (3 * X * X + a * ZZ * ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y * Z % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_add(
+    P: Tuple[int, int, int], Q: Tuple[int, int, int], a: int, p: int
+) -> Tuple[int, int, int]:
+    """
+    Add two points in Jacobian coordinates.
+
+    :param P: The first point (X, Y, Z).
+    :param Q: The second point (X, Y, Z).
+    :param a: Coefficient a of the curve.
+    :param p: Order of field F_p.
+    :returns: P + Q in Jacobian coordinates.
+    """
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    if U1 == U2:
+        if S1 != S2:
+            return _JACOBIAN_INFINITY
+        return _jacobian_double(P, a, p)
+    H = (U2 - U1) % p
+    R = (S2 - S1) % p
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    Z3 = H * Z1 * Z2 % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_add_affine(
+    P: Tuple[int, int, int], x: int, y: int, a: int, p: int
+) -> Tuple[int, int, int]:
+    """
+    Add an affine point to a point in Jacobian coordinates (mixed addition).
+
+    :param P: The point (X, Y, Z) in Jacobian coordinates.
+    :param x: x-coordinate of the affine point.
+    :param y: y-coordinate of the affine point.
+    :param a: Coefficient a of the curve.
+    :param p: Order of field F_p.
+    :returns: P + (x, y) in Jacobian coordinates.
+    """
+    X1, Y1, Z1 = P
+    if Z1 == 0:
+        return (x % p, y % p, 1)
+    Z1Z1 = Z1 * Z1 % p
+    U2 = x * Z1Z1 % p
+    S2 = y * Z1 * Z1Z1 % p
+    if X1 == U2:
+        if Y1 != S2:
+            return _JACOBIAN_INFINITY
+        return _jacobian_double(P, a, p)
+    H = (U2 - X1) % p
+    R = (S2 - Y1) % p
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - Y1 * HHH) % p
+    Z3 = H * Z1 % p
+    return (X3, Y3, Z3)
+
+
+def _jacobian_to_affine(P: Tuple[int, int, int], p: int) -> Tuple[int, int]:
+    """
+    Convert a point in Jacobian coordinates to affine coordinates.
+
+    :param P: The point (X, Y, Z) to convert, which must not be the point at
+    infinity.
+    :param p: Order of field F_p.
+    :returns: Affine coordinates (x, y).
+    """
+    X, Y, Z = P
+    Z_inv = inv_mod(Z, p)
+    Z_inv2 = Z_inv * Z_inv % p
+    return (X * Z_inv2 % p, Y * Z_inv2 * Z_inv % p)
+
+
+def _jacobian_to_affine_many(
+    points: Sequence[Tuple[int, int, int]], p: int
+) -> List[Tuple[int, int]]:
+    """
+    Convert many points in Jacobian coordinates to affine coordinates with a
+    single modular inversion.
+
+    :param points: The points (X, Y, Z) to convert, none of them the point at
+    infinity.
+    :param p: Order of field F_p.
+    :returns: Affine coordinates (x, y) of each point, in order.
+    """
+    Z_invs = batch_inv_mod([Z for _, _, Z in points], p)
+    result = []
+    for (X, Y, _), Z_inv in zip(points, Z_invs):
+        Z_inv2 = Z_inv * Z_inv % p
+        result.append((X * Z_inv2 % p, Y * Z_inv2 * Z_inv % p))
+    return result
+
+
+def _from_jacobian_many(
+    points: Sequence[Tuple[int, int, int]], curve: CurveParam
+) -> List["CurvePoint"]:
+    """
+    Convert many points in Jacobian coordinates back to affine CurvePoints
+    with a single modular inversion.
+
+    :param points: The points (X, Y, Z) to convert.
+    :param curve: The curve the points belong to.
+    :returns: Affine CurvePoints, in order.
+    """
+    finite = [P for P in points if P[2] != 0]
+    affine = iter(_jacobian_to_affine_many(finite, curve.p))
+    return [
+        CurvePoint.infinity(curve) if P[2] == 0 else CurvePoint(curve, pos=next(affine))
+        for P in points
+    ]
+
+
+def _from_jacobian(P: Tuple[int, int, int], curve: CurveParam) -> "CurvePoint":
+    """
+    Convert a point in Jacobian coordinates back to an affine CurvePoint.
+
+    :param P: The point (X, Y, Z) to convert.
+    :param curve: The curve the point belongs to.
+    :returns: Affine CurvePoint.
+    """
+    if P[2] == 0:
+        return CurvePoint.infinity(curve)
+    return CurvePoint(curve, pos=_jacobian_to_affine(P, curve.p))
+
+
+FixedBaseTable = List[List[Tuple[int, int]]]
+
+# Width in bits of the windows used by the fixed-base tables.
+FIXED_BASE_WIDTH = 4
+
+# Process-wide fixed-base tables, keyed by (p, a, basepoint) so that every
+# CurveParam describing the same group shares one table.
+_fixed_base_tables: Dict[Tuple[int, int, Tuple[int, int]], FixedBaseTable] = {}
+
+
+def _fixed_base_table(curve: CurveParam) -> FixedBaseTable:
+    """
+    Get the fixed-base table of the curve basepoint, building it on first use.
+
+    Entry table[i][j - 1] holds j * 2^(w * i) * G in affine coordinates, where
+    w is FIXED_BASE_WIDTH. A scalar below n is then the sum of one entry per
+    w-bit window, so multiplication needs no doublings.
+
+    :param curve: The curve whose basepoint is used.
+    :returns: The fixed-base table.
+    """
+    p = curve.p
+    a = curve.a
+    key = (p, a, curve.basepoint)
+    table = _fixed_base_tables.get(key)
+    if table is not None:
+        return table
+    windows = -(-curve.n.bit_length() // FIXED_BASE_WIDTH)
+    row_len = (1 << FIXED_BASE_WIDTH) - 1
+    jacobian_table = []
+    base = (curve.basepoint[0], curve.basepoint[1], 1)
+    for _ in range(windows):
+        jacobian_table.append(base)
+        for _ in range(row_len - 1):
+            jacobian_table.append(_jacobian_add(jacobian_table[-1], base, a, p))
+        base = _jacobian_add(jacobian_table[-1], base, a, p)
+    affine = _jacobian_to_affine_many(jacobian_table, p)
+    table = [affine[i : i + row_len] for i in range(0, len(affine), row_len)]
+    _fixed_base_tables[key] = table
+    return table
+
+
+def precompute_basepoint(curve: CurveParam) -> None:
+    """
+    Build the fixed-base table of the curve basepoint ahead of first use.
+
+    :param curve: The curve whose basepoint table is built.
+    """
+    _fixed_base_table(curve)
+
+
+def _fixed_base_mul(scalar: int, curve: CurveParam) -> Tuple[int, int, int]:
+    """
+    Multiply the curve basepoint by scalar using the fixed-base table.
+
+    :param scalar: Non-negative scalar to multiply the basepoint with.
+    :param curve: The curve whose basepoint is used.
+    :returns: Multiplication result in Jacobian coordinates.
+    """
+    p = curve.p
+    a = curve.a
+    table = _fixed_base_table(curve)
+    scalar %= curve.n
+    mask = (1 << FIXED_BASE_WIDTH) - 1
+    result = _JACOBIAN_INFINITY
+    for row in table:
+        if scalar == 0:
+            break
+        digit = scalar & mask
+        if digit:
+            x, y = row[digit - 1]
+            result = _jacobian_add_affine(result, x, y, a, p)
+        scalar >>= FIXED_BASE_WIDTH
+    return result
+
+
+# Default window width of the wNAF used for variable-base multiplication.
+WNAF_WIDTH = 5
+
+
+def _wnaf(scalar: int, width: int) -> List[int]:
+    """
+    Compute the width-w non-adjacent form of a scalar.
+
+    Every nonzero digit is odd with absolute value below 2^(w - 1), and any w
+    consecutive digits contain at most one nonzero digit.
+
+    :param scalar: Non-negative scalar to convert.
+    :param width: Window width w, at least 2.
+    :returns: wNAF digits, least significant first.
+    """
+    digits = [0] * (scalar.bit_length() + 1)
+    window = 1 << width
+    i = 0
+    while scalar:
+        if scalar & 1:
+            digit = scalar & (window - 1)
+            if digit >= window >> 1:
+                digit -= window
+            digits[i] = digit
+            scalar -= digit
+        scalar >>= 1
+        i += 1
+    return digits[:i]
+
+
+def _interleaved_mul(
+    scalars: Sequence[int], tables: Sequence[List[Tuple[int, int]]], a: int, p: int
+) -> Tuple[int, int, int]:
+    """
+    Compute the sum of scalars[i] * P_i with interleaved wNAFs, so that all
+    terms share one chain of doublings.
+
+    :param scalars: Nonzero scalars. Negative scalars subtract their term.
+    :param tables: Odd multiples of each P_i, as built for width WNAF_WIDTH.
+    :param a: Coefficient a of the curve.
+    :param p: Order of field F_p.
+    :returns: The sum in Jacobian coordinates.
+    """
+    nafs = []
+    for scalar in scalars:
+        if scalar < 0:
+            nafs.append([-digit for digit in _wnaf(-scalar, WNAF_WIDTH)])
+        else:
+            nafs.append(_wnaf(scalar, WNAF_WIDTH))
+    result = _JACOBIAN_INFINITY
+    for i in range(max(len(naf) for naf in nafs) - 1, -1, -1):
+        result = _jacobian_double(result, a, p)
+        for naf, table in zip(nafs, tables):
+            if i >= len(naf) or naf[i] == 0:
+                continue
+            digit = naf[i]
+            if digit > 0:
+                x, y = table[digit >> 1]
+                result = _jacobian_add_affine(result, x, y, a, p)
+            else:
+                x, y = table[-digit >> 1]
+                result = _jacobian_add_affine(result, x, p - y, a, p)
+    return result
 
 
 class CurvePoint:
+    __slots__ = ("curve", "x", "y", "_wnaf_tables")
+
     def __init__(
         self,
         curve: CurveParam,
@@ -17,26 +326,56 @@ class CurvePoint:
         y: Optional[int] = None,
         pos: Optional[Tuple[int, int]] = None,
         octet_str: Optional[str] = None,
+        octets: Optional[Octets] = None,
     ):
         """
-        Initialize CurvePoint.
+        Initialize CurvePoint. The point at infinity has None as both
+        coordinates, see CurvePoint.infinity.
 
         :param curve: The curve this point belongs to.
         :param x: Optional. x-coordinate of this point.
         :param y: Optional. y-coordinate of this point.
         :param pos: Optional. (x, y)-cordinate of this point.
         :param octet_str: Optional. Octet string form of point.
+        :param octets: Optional. SEC 1 encoded octets of point.
         """
         if x != None and y != None:
             self.x = x
             self.y = y
         elif pos != None:
             self.x, self.y = pos
-        elif octet_str != None:
-            self.x, self.y = octet_str_to_point(octet_str, curve.params)
+        elif octet_str != None or octets != None:
+            if octet_str != None:
+                decoded = octet_str_to_point(octet_str, curve.params, curve.sqrt)
+            else:
+                decoded = octets_to_point(octets, curve.params, curve.sqrt)
+            self.x, self.y = (None, None) if decoded is None else decoded
         else:
             raise ValueError("No point specified")
         self.curve = curve
+        self._wnaf_tables: Optional[Dict[int, List[Tuple[int, int]]]] = None
+
+    @classmethod
+    def infinity(cls, curve: CurveParam) -> "CurvePoint":
+        """
+        Get the point at infinity of a curve.
+
+        :param curve: The curve the point belongs to.
+        :returns: The point at infinity.
+        """
+        point = cls.__new__(cls)
+        point.curve = curve
+        point.x = None
+        point.y = None
+        point._wnaf_tables = None
+        return point
+
+    @property
+    def is_infinity(self) -> bool:
+        """
+        Check whether this is the point at infinity.
+        """
+        return self.x is None
 
     def __add__(self, another: "CurvePoint") -> "CurvePoint":
         """
@@ -47,31 +386,22 @@ class CurvePoint:
         different curves.
         :returns: Addition result of two points.
         """
-        assert self.curve.params == another.curve.params
-        if self.x == self.y == 0:
-            return CurvePoint(self.curve, pos=(another.x, another.y))
-        elif another.x == another.y == 0:
-            return CurvePoint(self.curve, pos=(self.x, self.y))
-        elif self.x == another.x:
+        assert self.curve is another.curve
+        if self.x is None:
+            return another
+        elif another.x is None:
+            return self
+        p = self.curve.p
+        if self.x == another.x:
             if self.y == another.y:
-                lambda_ = (
-                    (3 * self.x ** 2 + self.curve.params["a"])
-                    * inv_mod(2 * self.y, self.curve.params["p"])
-                    % self.curve.params["p"]
-                )
-                result_x = (lambda_ ** 2 - 2 * self.x) % self.curve.params["p"]
-                result_y = (lambda_ * (self.x - result_x) - self.y) % self.curve.params[
-                    "p"
-                ]
+                lambda_ = (3 * self.x ** 2 + self.curve.a) * inv_mod(2 * self.y, p) % p
+                result_x = (lambda_ ** 2 - 2 * self.x) % p
+                result_y = (lambda_ * (self.x - result_x) - self.y) % p
                 return CurvePoint(self.curve, x=result_x, y=result_y)
-            return CurvePoint(self.curve, x=0, y=0)
-        lambda_ = (
-            (another.y - self.y)
-            * inv_mod(another.x - self.x, self.curve.params["p"])
-            % self.curve.params["p"]
-        )
-        result_x = (lambda_ ** 2 - self.x - another.x) % self.curve.params["p"]
-        result_y = (lambda_ * (self.x - result_x) - self.y) % self.curve.params["p"]
+            return CurvePoint.infinity(self.curve)
+        lambda_ = (another.y - self.y) * inv_mod(another.x - self.x, p) % p
+        result_x = (lambda_ ** 2 - self.x - another.x) % p
+        result_y = (lambda_ * (self.x - result_x) - self.y) % p
         return CurvePoint(self.curve, pos=(result_x, result_y))
 
     def __rmul__(self, scalar: int) -> "CurvePoint":
@@ -81,17 +411,161 @@ class CurvePoint:
         :param scalar: The scalar to multiply the point with.
         :returns: Multiplication result.
         """
+        return self.mul(scalar)
+
+    def mul(self, scalar: int, width: int = WNAF_WIDTH) -> "CurvePoint":
+        """
+        Multiply the point by scalar using its width-w NAF.
+
+        :param scalar: The scalar to multiply the point with.
+        :param width: Optional. Window width w of the NAF, at least 2.
+        :returns: Multiplication result.
+        """
         if scalar < 0:
-            return -((-scalar) * self)
-        elif scalar == 0:
-            return CurvePoint(self.curve, pos=(0, 0))
-        result = CurvePoint(self.curve, pos=(0, 0))
-        bitlen = floor(log2(scalar)) + 1
-        for shift in range(bitlen - 1, -1, -1):
-            bit = (scalar >> shift) & 1
-            result += result
-            if bit == 1:
-                result += self
+            return -self.mul(-scalar, width)
+        elif scalar == 0 or self.x is None:
+            return CurvePoint.infinity(self.curve)
+        if (self.x, self.y) == self.curve.basepoint:
+            return _from_jacobian(_fixed_base_mul(scalar, self.curve), self.curve)
+        p = self.curve.p
+        a = self.curve.a
+        table = self._odd_multiples(width)
+        result = _JACOBIAN_INFINITY
+        for digit in reversed(_wnaf(scalar, width)):
+            result = _jacobian_double(result, a, p)
+            if digit > 0:
+                x, y = table[digit >> 1]
+                result = _jacobian_add_affine(result, x, y, a, p)
+            elif digit < 0:
+                x, y = table[-digit >> 1]
+                result = _jacobian_add_affine(result, x, p - y, a, p)
+        return _from_jacobian(result, self.curve)
+
+    def mul_ladder(self, scalar: int) -> "CurvePoint":
+        """
+        Multiply the point by scalar with a Montgomery ladder. The scalar is
+        reduced mod n and padded with multiples of n to n_bitlen + 1 bits, and
+        every bit costs exactly one addition and one doubling, so the number
+        of field operations does not depend on the scalar. This is slower than
+        mul, and meant for secret scalars.
+
+        :param scalar: The scalar to multiply the point with.
+        :returns: Multiplication result.
+        """
+        n = self.curve.n
+        scalar %= n
+        if scalar == 0 or self.x is None:
+            return CurvePoint.infinity(self.curve)
+        k = scalar + n
+        if k.bit_length() == self.curve.n_bitlen:
+            k += n
+        p = self.curve.p
+        a = self.curve.a
+        P = (self.x, self.y % p, 1)
+        R = [P, _jacobian_double(P, a, p)]
+        for shift in range(self.curve.n_bitlen - 1, -1, -1):
+            bit = (k >> shift) & 1
+            R[1 - bit] = _jacobian_add(R[0], R[1], a, p)
+            R[bit] = _jacobian_double(R[bit], a, p)
+        return _from_jacobian(R[0], self.curve)
+
+    def _odd_multiples(self, width: int) -> List[Tuple[int, int]]:
+        """
+        Get the odd multiples P, 3P, ..., (2^(w - 1) - 1)P of this point in
+        affine coordinates, building and caching them on first use.
+
+        :param width: Window width w of the NAF.
+        :returns: The odd multiples, indexed by (multiple - 1) / 2.
+        """
+        if self._wnaf_tables is None:
+            self._wnaf_tables = {}
+        table = self._wnaf_tables.get(width)
+        if table is not None:
+            return table
+        p = self.curve.p
+        a = self.curve.a
+        P = (self.x % p, self.y % p, 1)
+        double_P = _jacobian_double(P, a, p)
+        jacobian_table = [P]
+        for _ in range((1 << (width - 2)) - 1):
+            jacobian_table.append(_jacobian_add(jacobian_table[-1], double_P, a, p))
+        table = _jacobian_to_affine_many(jacobian_table, p)
+        self._wnaf_tables[width] = table
+        return table
+
+    @staticmethod
+    def multi_mul(
+        scalars: Sequence[int], points: Sequence["CurvePoint"]
+    ) -> "CurvePoint":
+        """
+        Compute scalars[0] * points[0] + scalars[1] * points[1] + ... in one
+        joint pass. Multiples of the curve basepoint are taken from its
+        fixed-base table, and the rest share their doublings.
+
+        :param scalars: The scalars to multiply the points with.
+        :param points: The points to multiply, all on the same curve.
+        :raises AssertionError: Assertion fails when the lengths differ, no
+        point is given, or points are from different curves.
+        :returns: Sum of the products.
+        """
+        return CurvePoint.multi_mul_batch([(scalars, points)])[0]
+
+    @staticmethod
+    def multi_mul_batch(
+        jobs: Sequence[Tuple[Sequence[int], Sequence["CurvePoint"]]],
+    ) -> List["CurvePoint"]:
+        """
+        Compute multi_mul for many independent (scalars, points) jobs. Points
+        shared between jobs reuse their precomputed tables, and all results
+        are converted to affine coordinates with a single modular inversion.
+
+        :param jobs: (scalars, points) pairs as taken by multi_mul, all on the
+        same curve.
+        :raises AssertionError: Assertion fails on an invalid job.
+        :returns: Sum of the products for each job.
+        """
+        if not jobs:
+            return []
+        curve = jobs[0][1][0].curve
+        results = []
+        for scalars, points in jobs:
+            assert points and points[0].curve is curve
+            results.append(CurvePoint._multi_mul_jacobian(scalars, points))
+        return _from_jacobian_many(results, curve)
+
+    @staticmethod
+    def _multi_mul_jacobian(
+        scalars: Sequence[int], points: Sequence["CurvePoint"]
+    ) -> Tuple[int, int, int]:
+        """
+        Compute the sum of products for multi_mul in Jacobian coordinates.
+
+        :param scalars: The scalars to multiply the points with.
+        :param points: The points to multiply, all on the same curve.
+        :raises AssertionError: Assertion fails when the lengths differ, no
+        point is given, or points are from different curves.
+        :returns: Sum of the products in Jacobian coordinates.
+        """
+        assert len(scalars) == len(points) and len(points) > 0
+        curve = points[0].curve
+        p = curve.p
+        a = curve.a
+        result = _JACOBIAN_INFINITY
+        joint_scalars = []
+        joint_tables = []
+        for scalar, point in zip(scalars, points):
+            assert point.curve is curve
+            if scalar == 0 or point.x is None:
+                continue
+            if (point.x, point.y % p) == curve.basepoint:
+                fixed = _fixed_base_mul(scalar, curve)
+                result = _jacobian_add(result, fixed, a, p)
+            else:
+                joint_scalars.append(scalar)
+                joint_tables.append(point._odd_multiples(WNAF_WIDTH))
+        if joint_scalars:
+            joint = _interleaved_mul(joint_scalars, joint_tables, a, p)
+            result = _jacobian_add(result, joint, a, p)
         return result
 
     def __neg__(self) -> "CurvePoint":
@@ -100,7 +574,9 @@ class CurvePoint:
 
         :returns: Negative of self.
         """
-        return CurvePoint(self.curve, pos=(self.x, -self.y))
+        if self.x is None:
+            return self
+        return CurvePoint(self.curve, pos=(self.x, -self.y % self.curve.p))
 
     def __eq__(self, another: "CurvePoint") -> bool:
         """
@@ -110,9 +586,7 @@ class CurvePoint:
         :returns: Equality check result.
         """
         return (
-            self.x == another.x
-            and self.y == another.y
-            and self.curve.name == another.curve.name
+            self.curve is another.curve and self.x == another.x and self.y == another.y
         )
 
     def __repr__(self) -> str:
@@ -121,26 +595,24 @@ class CurvePoint:
 
         :returns: Representation in string.
         """
+        position = "Point at infinity" if self.x is None else f"({self.x}, {self.y})"
         return (
-            f"({self.x}, {self.y}) on curve "
-            f"y^2 = x^3 + {self.curve.params['a']}x + {self.curve.params['b']}, "
-            f"F_{self.curve.params['p']}"
+            f"{position} on curve "
+            f"y^2 = x^3 + {self.curve.a}x + {self.curve.b}, F_{self.curve.p}"
         )
 
     def octet_str(self) -> str:
         """
         Serialize to compressed octet string form.
         """
-        if self.x == self.y == 0:
-            return "00"
-        octet_list = []
-        y_tilde_P = self.y % 2
-        if y_tilde_P == 0:
-            octet_list.append(2)
-        else:
-            octet_list.append(3)
-        octet_list.extend(field_elem_to_octet_list(self.x))
-        octet_str = hex(octet_list_to_int(octet_list)).replace("0x", "", 1)
-        if len(octet_str) % 2 != 0:
-            octet_str = "0" + octet_str
-        return octet_str
+        return self.to_octets().hex()
+
+    def to_octets(self, compressed: bool = True) -> bytes:
+        """
+        Serialize to SEC 1 encoded octets.
+
+        :param compressed: Optional. Use the compressed form. Defaults to True.
+        :returns: Encoded point.
+        """
+        position = None if self.x is None else (self.x, self.y)
+        return point_to_octets(position, self.curve.p, compressed)
@@ -1,7 +1,130 @@
 from itertools import zip_longest
-from math import ceil, log2
-from typing import Dict, Iterable, List, Tuple
-from .numbertheory import tonelli
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from .numbertheory import square_root
+
+# Anything that exposes bytes through the buffer protocol.
+Octets = Union[bytes, bytearray, memoryview]
+
+
+def octets_to_int(octets: Octets) -> int:
+    """
+    Convert big-endian octets to integer.
+
+    :param octets: Octets to convert.
+    :returns: Converted integer.
+    """
+    return int.from_bytes(octets, "big")
+
+
+def int_to_octets(value: int, length: Optional[int] = None) -> bytes:
+    """
+    Convert non-negative integer to big-endian octets.
+
+    :param value: Integer to convert.
+    :param length: Optional. Number of octets. Defaults to the fewest octets
+    that hold the value, which is at least one.
+    :returns: Converted octets.
+    :raises OverflowError: OverflowError is raised when value does not fit.
+    """
+    if length is None:
+        length = max(1, (value.bit_length() + 7) // 8)
+    return value.to_bytes(length, "big")
+
+
+def octets_to_field_elem(octets: Octets, p: int) -> int:
+    """
+    Convert octets to field element. Note that field F_{2^m} is not supported
+    in this implementation.
+
+    :param octets: Octets to convert.
+    :param p: Order of group F_p.
+    :returns: Converted integer, which is a field element.
+    :raises ValueError: ValueError is raised when the value is not in F_p.
+    """
+    elem = int.from_bytes(octets, "big")
+    if not 0 <= elem < p:
+        raise ValueError(f"Field F_{p} does not contain: {elem}")
+    return elem
+
+
+def field_elem_length(p: int) -> int:
+    """
+    Get the number of octets of an encoded element of F_p.
+
+    :param p: Order of group F_p.
+    :returns: Octet length of a field element.
+    """
+    return (p.bit_length() + 7) // 8
+
+
+def octets_to_point(
+    octets: Octets,
+    params: Dict[str, int],
+    sqrt: Optional[Callable[[int], int]] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Convert SEC 1 encoded octets to EC point.
+
+    :param octets: Compressed or uncompressed encoding of the point.
+    :param params: EC params p, a, b in dict form.
+    :param sqrt: Optional. Square root function modulo p. Selected from p if
+    not given.
+    :returns: Converted EC point (x, y), or None for the point at infinity.
+    :raises ValueError: ValueError is raised when octet string is invalid.
+    :raises NotImplementedError: Support for curve over F_(2^m) is not
+    implemented.
+    """
+    octets = memoryview(octets)
+    p = params["p"]
+    coord_len = field_elem_length(p)
+    if len(octets) == 1 and octets[0] == 0:
+        return None
+    if len(octets) == coord_len + 1:
+        Y = octets[0]
+        if Y not in (2, 3):
+            raise ValueError(f"Invalid Y value: {Y}")
+        x_P = octets_to_field_elem(octets[1:], p)
+        y_tilde_P = Y & 1
+        if p % 2 == 0:
+            raise NotImplementedError("Support for F_{2^m} is not implemented")
+        alpha = (x_P * x_P * x_P + params["a"] * x_P + params["b"]) % p
+        if sqrt is None:
+            sqrt = square_root(p)
+        beta = sqrt(alpha)
+        if (beta - y_tilde_P) % 2 == 0:
+            y_P = beta
+        else:
+            y_P = p - beta
+        return (x_P, y_P)
+    elif len(octets) == 2 * coord_len + 1:
+        W = octets[0]
+        if W != 4:
+            raise ValueError(f"Invalid W value: {W}")
+        x_P = octets_to_field_elem(octets[1 : coord_len + 1], p)
+        y_P = octets_to_field_elem(octets[coord_len + 1 :], p)
+        return (x_P, y_P)
+    raise ValueError("Invalid octet string length")
+
+
+def point_to_octets(
+    point: Optional[Tuple[int, int]], p: int, compressed: bool = True
+) -> bytes:
+    """
+    Convert EC point to SEC 1 encoded octets.
+
+    :param point: EC point (x, y), or None for the point at infinity.
+    :param p: Order of group F_p.
+    :param compressed: Optional. Use the compressed form. Defaults to True.
+    :returns: Encoded point.
+    """
+    if point is None:
+        return b"\x00"
+    x, y = point
+    coord_len = field_elem_length(p)
+    y %= p
+    if compressed:
+        return bytes((2 | (y & 1),)) + x.to_bytes(coord_len, "big")
+    return b"\x04" + x.to_bytes(coord_len, "big") + y.to_bytes(coord_len, "big")
 
 
 def octet_str_to_int(octet_str: str) -> int:
@@ -37,10 +160,20 @@ def octet_str_to_octet_list(octet_str: str) -> List[int]:
     :param octet_str: Octet string to convert.
     :returns: Converted octet list.
     """
+    return list(octet_str_to_octets(octet_str))
+
+
+def octet_str_to_octets(octet_str: str) -> bytes:
+    """
+    Convert octet string to octets.
+
+    :param octet_str: Octet string to convert.
+    :returns: Converted octets.
+    """
     stripped = "".join(octet_str.split())
     if len(stripped) % 2 != 0:
         stripped = "0" + stripped
-    return grouper(2, stripped)
+    return bytes.fromhex(stripped)
 
 
 def octet_list_to_int(octet_list: List[int]) -> int:
@@ -50,11 +183,7 @@ def octet_list_to_int(octet_list: List[int]) -> int:
     :param octet_list: Octet list to convert.
     :returns: Converted integer.
     """
-    result = 0
-    for octet in octet_list:
-        result <<= 8
-        result += octet
-    return result
+    return octets_to_int(bytes(octet_list))
 
 
 def octet_list_to_field_elem(octet_list: List[int], p: int) -> int:
@@ -66,10 +195,7 @@ def octet_list_to_field_elem(octet_list: List[int], p: int) -> int:
     :param p: Order of group F_p.
     :returns: Converted integer, which is a field element.
     """
-    elem = octet_list_to_int(octet_list)
-    if not 0 <= elem < p:
-        raise ValueError(f"Field F_{p} does not contain: {elem}")
-    return elem
+    return octets_to_field_elem(bytes(octet_list), p)
 
 
 def field_elem_to_octet_list(elem: int) -> List[int]:
@@ -80,50 +206,24 @@ def field_elem_to_octet_list(elem: int) -> List[int]:
     :param elem: Element of field F_p
     :returns: Converted octet list.
     """
-    octet_str = hex(elem).replace("0x", "", 1)
-    if len(octet_str) % 2 != 0:
-        octet_str = "0" + octet_str
-    return grouper(2, octet_str)
+    return list(int_to_octets(elem))
 
 
-def octet_str_to_point(octet_str: str, params: Dict[str, int]) -> Tuple[int, int]:
+def octet_str_to_point(
+    octet_str: str,
+    params: Dict[str, int],
+    sqrt: Optional[Callable[[int], int]] = None,
+) -> Optional[Tuple[int, int]]:
     """
     Convert octet string to EC point.
 
     :param octet_str: Octet string to convert.
     :param params: EC params p, a, b in dict form.
-    :returns: Converted EC point (x, y).
+    :param sqrt: Optional. Square root function modulo p. Selected from p if
+    not given.
+    :returns: Converted EC point (x, y), or None for the point at infinity.
     :raises ValueError: ValueError is raised when octet string is invalid.
     :raises NotImplementedError: Support for curve over F_(2^m) is not
     implemented.
     """
-    octets = octet_str_to_octet_list(octet_str)
-    if len(octets) == 1 and octets[0] == "00":
-        return (0, 0)
-    if len(octets) == ceil(log2(params["p"]) / 8) + 1:
-        Y = octets[0]
-        X = octets[1:]
-        x_P = octet_list_to_field_elem(X, params["p"])
-        if Y not in (2, 3):
-            raise ValueError(f"Invalid Y value: {Y}")
-        y_tilde_P = 0 if Y == 2 else 1
-        if params["p"] % 2 == 0:
-            raise NotImplementedError("Support for F_{2^m} is not implemented")
-        alpha = (x_P ** 3 + params["a"] * x_P + params["b"]) % params["p"]
-        beta = tonelli(alpha, params["p"])
-        if (beta - y_tilde_P) % 2 == 0:
-            y_P = beta
-        else:
-            y_P = params["p"] - beta
-        return (x_P, y_P)
-    elif len(octets) == 2 * ceil(log2(params["p"]) / 8) + 1:
-        W = octets[0]
-        coord_len = ceil(log2(params["p"]) / 8)
-        X = octets[1 : coord_len + 1]
-        Y = octets[coord_len + 1 :]
-        if W != 4:
-            raise ValueError(f"Invalid W value: {W}")
-        x_P = octet_list_to_field_elem(X, params["p"])
-        y_P = octet_list_to_field_elem(Y, params["p"])
-        return (x_P, y_P)
-    raise ValueError("Invalid octet string length")
+    return octets_to_point(octet_str_to_octets(octet_str), params, sqrt)
@@ -1,10 +1,10 @@
-﻿from math import ceil, log2
-import secrets
-from typing import Callable, Optional, Tuple
+﻿import secrets
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from .curvepoint import CurvePoint
 from .curveparam import CurveParam
-from .data_conversion import octet_list_to_int, octet_str_to_octet_list
-from .numbertheory import inv_mod
+from .data_conversion import octet_str_to_octets
+from .nonce import Nonce, NoncePool, make_nonce, rfc6979_nonces
+from .numbertheory import batch_inv_mod, inv_mod
 
 
 class ECDSA:
@@ -13,16 +13,37 @@ class ECDSA:
         curve: CurveParam,
         hash_func: Callable,
         key_pair: Optional[Tuple[Optional[int], CurvePoint]] = None,
+        deterministic: bool = False,
+        nonce_pool: Optional[NoncePool] = None,
+        ladder: bool = False,
     ):
         """
         Initalize ECDSA.
 
         :param curve: Curve used to sign.
+        :param hash_func: Hash function returning the digest in hex string
+        form. If it also provides digest(), like hashes.HashFunction, the raw
+        digest is used directly.
         :param key_pair: Key pair to use. Private key can be None if the object
         is not intended for signature creation.
+        :param deterministic: Optional. Derive nonces from the private key and
+        message as in RFC 6979. The hash function must provide digest() and
+        hmac(), like hashes.HashFunction.
+        :param nonce_pool: Optional. Pool of precomputed random nonces to sign
+        with. Cannot be combined with deterministic.
+        :param ladder: Optional. Multiply by the private key and nonces with
+        CurvePoint.mul_ladder, whose operation count does not depend on the
+        scalar.
+        :raises AssertionError: Assertion fails when both deterministic and
+        nonce_pool are given.
         """
+        assert not (deterministic and nonce_pool), "nonce pool is not deterministic"
         self.curve = curve
         self.hash_func = hash_func
+        self._digest = getattr(hash_func, "digest", None)
+        self.deterministic = deterministic
+        self.nonce_pool = nonce_pool
+        self.ladder = ladder
         self.G = CurvePoint(curve, pos=self.curve.basepoint)
         if key_pair == None:
             self.d_U, self.Q_U = self.create_key_pair()
@@ -35,8 +56,8 @@ class ECDSA:
 
         :returns: ECDSA key pair (d, Q).
         """
-        d = secrets.randbelow(self.curve.params["p"] - 1) + 1
-        Q = d * self.G
+        d = secrets.randbelow(self.curve.p - 1) + 1
+        Q = self.G.mul_ladder(d) if self.ladder else d * self.G
         return (d, Q)
 
     def create_sign(self, message: bytes) -> Tuple[int, int]:
@@ -48,30 +69,110 @@ class ECDSA:
         :raises AssertionError: Assertion fails when private key is None.
         """
         assert self.d_U != None
-        r = 0
-        k = 0
-        R = CurvePoint(self.curve, pos=(0, 0))
-        r = 0
-        while r == 0:
-            k, R = self.create_key_pair()
-            x_R = R.x
-            r = x_R % self.curve.params["n"]
-        s = 0
-
-        H = octet_str_to_octet_list(self.hash_func(message))
-        H_bar = octet_list_to_int(H)
-        n_bitlen = ceil(log2(self.curve.params["n"]))
-        if n_bitlen >= 8 * len(H):
-            e = H_bar
+        n = self.curve.n
+        H = self._hash(message)
+        e = self._truncate(H)
+        for k, R, k_inv in self._nonces(H):
+            r = R.x % n
+            if r == 0:
+                continue
+            s = k_inv * (e + r * self.d_U) % n
+            if s == 0:
+                continue
+            return (r, s)
+        raise AssertionError("nonce generator is exhausted")
+
+    def _nonces(self, digest: bytes) -> Iterator[Nonce]:
+        """
+        Generate nonces to sign with until a valid signature comes out.
+
+        :param digest: Hash digest of the message to sign.
+        :returns: Iterator over (k, k * G, k^-1 mod n).
+        """
+        if self.deterministic:
+            for k in rfc6979_nonces(
+                self.d_U,
+                digest,
+                self.curve.n,
+                self.hash_func.hmac,
+                self.hash_func.digest_size,
+            ):
+                yield make_nonce(self.curve, k, self.ladder)
+        elif self.nonce_pool is not None:
+            while True:
+                yield self.nonce_pool.get()
         else:
-            e = H_bar >> (8 * len(H) - n_bitlen)
+            while True:
+                k, R = self.create_key_pair()
+                yield (k, R, inv_mod(k, self.curve.n))
+
+    def _hash(self, message: bytes) -> bytes:
+        """
+        Hash the message.
+
+        :param message: The message to hash.
+        :returns: Raw hash digest.
+        """
+        if self._digest is not None:
+            return self._digest(message)
+        return octet_str_to_octets(self.hash_func(message))
+
+    def _truncate(self, H: bytes) -> int:
+        """
+        Convert a hash digest to integer truncated to the bit length of n.
+
+        :param H: Raw hash digest.
+        :returns: Message representative e.
+        """
+        H_bar = int.from_bytes(H, "big")
+        return H_bar >> max(0, 8 * len(H) - self.curve.n_bitlen)
+
+    def _message_representative(self, message: bytes) -> int:
+        """
+        Hash the message and truncate it to the bit length of n.
+
+        :param message: The message to hash.
+        :returns: Message representative e.
+        """
+        return self._truncate(self._hash(message))
+
+    def _verification_scalars(
+        self, message: bytes, signature: Tuple[int, int]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Compute the scalars u1, u2 where R = u1 * G + u2 * Q_U.
+
+        :param message: The message for verification.
+        :param signature: The signature to verify.
+        :returns: (u1, u2), or None if r or s is out of range.
+        """
+        r, s = signature
+        if not 1 <= r <= (self.curve.n - 1):
+            return None
+        if not 1 <= s <= (self.curve.n - 1):
+            return None
+
+        e = self._message_representative(message)
+
+        s_inv = inv_mod(s, self.curve.n)
+        u1 = e * s_inv % self.curve.n
+        u2 = r * s_inv % self.curve.n
+        return (u1, u2)
+
+    def _check_r(self, R: CurvePoint, r: int) -> bool:
+        """
+        Check that R is not the point at infinity and x_R mod n equals r.
+
+        :param R: The point R = u1 * G + u2 * Q_U.
+        :param r: The r part of the signature.
+        :returns: True if R matches r.
+        """
+        if R.is_infinity:
+            return False
 
-        s = (
-            inv_mod(k, self.curve.params["n"])
-            * (e + r * self.d_U)
-            % self.curve.params["n"]
-        )
-        return (r, s)
+        x_R = R.x
+        v = x_R % self.curve.n
+        return v == r
 
     def verify_sign(self, message: bytes, signature: Tuple[int, int]) -> bool:
         """
@@ -81,27 +182,48 @@ class ECDSA:
         :param signature: The signature to verify.
         :return: True if signature is valid, and False if invalid.
         """
-        r, s = signature
-        if not 1 <= r <= (self.curve.params["n"] - 1):
+        if self.Q_U.is_infinity:
             return False
-        if not 1 <= s <= (self.curve.params["n"] - 1):
+        scalars = self._verification_scalars(message, signature)
+        if scalars is None:
             return False
 
-        H = octet_str_to_octet_list(self.hash_func(message))
-        H_bar = octet_list_to_int(H)
-        n_bitlen = ceil(log2(self.curve.params["n"]))
-        if n_bitlen >= 8 * len(H):
-            e = H_bar
-        else:
-            e = H_bar >> (8 * len(H) - n_bitlen)
+        R = CurvePoint.multi_mul(scalars, (self.G, self.Q_U))
+        return self._check_r(R, signature[0])
+
+    def verify_batch(
+        self, items: Iterable[Tuple[bytes, Tuple[int, int], CurvePoint]]
+    ) -> List[bool]:
+        """
+        Verify many signatures at once. Every item is checked exactly like
+        verify_sign, but the items share the work that can be batched: all s
+        are inverted together with batch_inv_mod, every distinct message is
+        hashed once, repeated public keys share their precomputed tables, and
+        the points R are normalized together.
 
-        u1 = e * inv_mod(s, self.curve.params["n"]) % self.curve.params["n"]
-        u2 = r * inv_mod(s, self.curve.params["n"]) % self.curve.params["n"]
+        :param items: (message, signature, public key) triples to verify.
+        :return: Verification result of each item, in order.
+        """
+        n = self.curve.n
+        results = []
+        accepted = []
+        for index, (message, signature, Q_U) in enumerate(items):
+            results.append(False)
+            r, s = signature
+            if 1 <= r <= n - 1 and 1 <= s <= n - 1 and not Q_U.is_infinity:
+                accepted.append((index, message, r, s, Q_U))
 
-        R = u1 * self.G + u2 * self.Q_U
-        if R.x == R.y == 0:
-            return False
+        s_invs = batch_inv_mod([item[3] for item in accepted], n)
+        representatives: Dict[bytes, int] = {}
+        public_keys: Dict[Tuple[int, int], CurvePoint] = {}
+        jobs = []
+        for (_, message, r, _, Q_U), s_inv in zip(accepted, s_invs):
+            e = representatives.get(message)
+            if e is None:
+                e = representatives[message] = self._message_representative(message)
+            Q_U = public_keys.setdefault((Q_U.x, Q_U.y), Q_U)
+            jobs.append(((e * s_inv % n, r * s_inv % n), (self.G, Q_U)))
 
-        x_R = R.x
-        v = x_R % self.curve.params["n"]
-        return v == r
+        for (index, _, r, _, _), R in zip(accepted, CurvePoint.multi_mul_batch(jobs)):
+            results[index] = self._check_r(R, r)
+        return results
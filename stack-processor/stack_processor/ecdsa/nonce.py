@@ -0,0 +1,134 @@
+import queue
+import secrets
+import threading
+from typing import Callable, Iterator, Tuple
+from .curveparam import CurveParam
+from .curvepoint import CurvePoint
+from .numbertheory import inv_mod
+
+# A precomputed nonce (k, k * G, k^-1 mod n).
+Nonce = Tuple[int, CurvePoint, int]
+
+
+def rfc6979_nonces(
+    d: int,
+    digest: bytes,
+    n: int,
+    hmac: Callable[[bytes, bytes], bytes],
+    hmac_size: int,
+) -> Iterator[int]:
+    """
+    Generate deterministic nonce candidates k as in RFC 6979, section 3.2.
+
+    :param d: Private key.
+    :param digest: Hash digest H(m) of the message to sign.
+    :param n: Group order n.
+    :param hmac: HMAC function taking (key, message) with the message hash.
+    :param hmac_size: Length of HMAC output in bytes.
+    :returns: Iterator over nonce candidates in [1, n - 1], in order.
+    """
+    qlen = n.bit_length()
+    rlen = (qlen + 7) // 8
+
+    def bits2int(octets: bytes) -> int:
+        return int.from_bytes(octets, "big") >> max(0, 8 * len(octets) - qlen)
+
+    x = d.to_bytes(rlen, "big")
+    h = (bits2int(digest) % n).to_bytes(rlen, "big")
+    V = b"\x01" * hmac_size
+    K = b"\x00" * hmac_size
+    K = hmac(K, V + b"\x00" + x + h)
+    V = hmac(K, V)
+    K = hmac(K, V + b"\x01" + x + h)
+    V = hmac(K, V)
+    while True:
+        T = b""
+        while len(T) < rlen:
+            V = hmac(K, V)
+            T += V
+        k = bits2int(T[:rlen])
+        if 1 <= k < n:
+            yield k
+        K = hmac(K, V + b"\x00")
+        V = hmac(K, V)
+
+
+def make_nonce(curve: CurveParam, k: int, ladder: bool = False) -> Nonce:
+    """
+    Compute the precomputable part of a signature for nonce k.
+
+    :param curve: Curve used to sign.
+    :param k: Nonce in [1, n - 1].
+    :param ladder: Optional. Compute k * G with CurvePoint.mul_ladder.
+    :returns: (k, k * G, k^-1 mod n).
+    """
+    G = CurvePoint(curve, pos=curve.basepoint)
+    R = G.mul_ladder(k) if ladder else k * G
+    return (k, R, inv_mod(k, curve.n))
+
+
+class NoncePool:
+    def __init__(self, curve: CurveParam, size: int = 64, ladder: bool = False):
+        """
+        Initialize a pool of random nonces that a background thread keeps
+        filled, so that signing only needs a few modular multiplications.
+
+        :param curve: Curve used to sign.
+        :param size: Maximum number of nonces kept ready.
+        :param ladder: Optional. Compute k * G with CurvePoint.mul_ladder.
+        """
+        self.curve = curve
+        self.ladder = ladder
+        self._queue: "queue.Queue[Nonce]" = queue.Queue(maxsize=size)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _random_nonce(self) -> Nonce:
+        """
+        Draw a random nonce and precompute it.
+
+        :returns: (k, k * G, k^-1 mod n).
+        """
+        k = secrets.randbelow(self.curve.n - 1) + 1
+        return make_nonce(self.curve, k, self.ladder)
+
+    def _fill(self) -> None:
+        """
+        Keep the queue filled until the pool is closed.
+        """
+        while not self._closed.is_set():
+            nonce = self._random_nonce()
+            while not self._closed.is_set():
+                try:
+                    self._queue.put(nonce, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self) -> Nonce:
+        """
+        Take a precomputed nonce, computing one on the spot if none is ready.
+        Every nonce is handed out at most once.
+
+        :returns: (k, k * G, k^-1 mod n).
+        """
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return self._random_nonce()
+
+    def ready(self) -> int:
+        """
+        Get the number of nonces ready to use.
+
+        :returns: Number of precomputed nonces in the queue.
+        """
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """
+        Stop the background thread.
+        """
+        self._closed.set()
+        self._thread.join()
@@ -1,3 +1,7 @@
+from functools import lru_cache, partial
+from typing import Callable, List, Sequence, Tuple
+
+
 def inv_mod(n: int, p: int):
     """
     Find a inverse of n mod p.
@@ -9,6 +13,29 @@ def inv_mod(n: int, p: int):
     return pow(n, -1, p)
 
 
+def batch_inv_mod(values: Sequence[int], p: int) -> List[int]:
+    """
+    Find inverses of many values mod p with Montgomery's trick, which takes a
+    single modular inversion plus 3(N - 1) multiplications.
+
+    :param values: Values to invert, none of them divisible by p.
+    :param p: Modulus.
+    :returns: Inverse of each value mod p, in order.
+    :raises ValueError: Raises ValueError when a value is not invertible.
+    """
+    prefix = []
+    acc = 1
+    for value in values:
+        prefix.append(acc)
+        acc = acc * value % p
+    inv = inv_mod(acc, p)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = prefix[i] * inv % p
+        inv = inv * values[i] % p
+    return result
+
+
 def legendre(a: int, p: int) -> int:
     """
     Calculate value of Legendre symbol (a/p).
@@ -20,17 +47,17 @@ def legendre(a: int, p: int) -> int:
     return pow(a, (p - 1) // 2, p)
 
 
-def tonelli(n: int, p: int):
+@lru_cache(maxsize=None)
+def _tonelli_params(p: int) -> Tuple[int, int, int]:
     """
-    Find a square root of n modulo p.
+    Precompute the values Tonelli-Shanks needs for a prime p.
 
-    :param n: Value of n where r^2 === n (mod p).
-    :param p: Value of p where r^2 === n (mod p).
-    :returns: Value of r where r^2 === n (mod p).
-    :raises AssertionError: Assertion fails when n is not a square number, or
-    non-quadratic residue mod p is not found in Z/pZ.
+    :param p: Odd prime modulus.
+    :returns: (Q, S, c) where p - 1 = Q * 2 ** S with Q odd, and c = z^Q for a
+    quadratic non-residue z mod p.
+    :raises AssertionError: Assertion fails when non-quadratic residue mod p is
+    not found in Z/pZ.
     """
-    assert legendre(n, p) == 1, "not a square (mod p)"
     Q = p - 1
     S = 0  # p - 1 = Q * 2 ** S, Q is odd
     while Q % 2 == 0:
@@ -38,28 +65,69 @@ def tonelli(n: int, p: int):
         Q //= 2
 
     z = 1
-    while legendre(z, p) != p - 1:
+    while z < p and legendre(z, p) != p - 1:
         z += 1
-    assert z != 0, "non-quadratic residue mod p not found"
+    assert z != p, "non-quadratic residue mod p not found"
+    return (Q, S, pow(z, Q, p))
+
 
-    M = S
-    c = pow(z, Q, p)
+def tonelli(n: int, p: int):
+    """
+    Find a square root of n modulo p.
+
+    :param n: Value of n where r^2 === n (mod p).
+    :param p: Value of p where r^2 === n (mod p).
+    :returns: Value of r where r^2 === n (mod p).
+    :raises AssertionError: Assertion fails when n is not a square number, or
+    non-quadratic residue mod p is not found in Z/pZ.
+    """
+    n %= p
+    if n == 0:
+        return 0
+    Q, M, c = _tonelli_params(p)
     t = pow(n, Q, p)
     R = pow(n, (Q + 1) // 2, p)
-    while t != 0 and t != 1:
+    while t != 1:
         i = 0
         z = t
-        while z != 1 and i < M - 1:
-            z = pow(z, 2, p)
+        while z != 1:
+            z = z * z % p
             i += 1
+            assert i < M, "not a square (mod p)"
         b = c
-        for _ in range(M - i - 1, 0, -1):
-            b = pow(b, 2, p)
+        for _ in range(M - i - 1):
+            b = b * b % p
         M = i
-        c = pow(b, 2, p)
-        t = t * pow(b, 2, p) % p
+        c = b * b % p
+        t = t * c % p
         R = R * b % p
-    if t == 0:
-        return 0
-    else:
-        return R
+    return R
+
+
+def _sqrt_3_mod_4(n: int, p: int, exponent: int) -> int:
+    """
+    Find a square root of n modulo a prime p where p === 3 (mod 4).
+
+    :param n: Value of n where r^2 === n (mod p).
+    :param p: Value of p where r^2 === n (mod p).
+    :param exponent: Precomputed (p + 1) / 4.
+    :returns: Value of r where r^2 === n (mod p).
+    :raises AssertionError: Assertion fails when n is not a square number.
+    """
+    r = pow(n, exponent, p)
+    assert r * r % p == n % p, "not a square (mod p)"
+    return r
+
+
+@lru_cache(maxsize=None)
+def square_root(p: int) -> Callable[[int], int]:
+    """
+    Select the fastest square root strategy for a prime p.
+
+    :param p: Odd prime modulus.
+    :returns: Function finding a square root of its argument modulo p, raising
+    AssertionError when there is none.
+    """
+    if p % 4 == 3:
+        return partial(_sqrt_3_mod_4, p=p, exponent=(p + 1) // 4)
+    return partial(tonelli, p=p)
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from .curveparam import CurveParam
+from .curvepoint import CurvePoint
+
+
+class PointCache:
+    def __init__(self, curve: CurveParam, maxsize: int = 1024):
+        """
+        Initialize a bounded LRU cache of decoded points.
+
+        Cached points keep their own precomputed multiplication tables, so a
+        hit also skips rebuilding those.
+
+        :param curve: The curve the encoded points belong to.
+        :param maxsize: Maximum number of points to keep.
+        """
+        self.curve = curve
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._points: "OrderedDict[bytes, CurvePoint]" = OrderedDict()
+
+    def get(self, octets: bytes) -> CurvePoint:
+        """
+        Decode an SEC 1 encoded public key, reusing the cached point if
+        present.
+
+        :param octets: Compressed or uncompressed encoding of the point.
+        :returns: Decoded point.
+        :raises ValueError: ValueError is raised when the encoding is invalid
+        or encodes the point at infinity, which is no valid public key.
+        """
+        octets = bytes(octets)
+        point = self._points.get(octets)
+        if point is not None:
+            self.hits += 1
+            self._points.move_to_end(octets)
+            return point
+        self.misses += 1
+        point = CurvePoint(self.curve, octets=octets)
+        if point.is_infinity:
+            raise ValueError("Public key is the point at infinity")
+        self._points[octets] = point
+        if len(self._points) > self.maxsize:
+            self._points.popitem(last=False)
+            self.evictions += 1
+        return point
+
+    def clear(self) -> None:
+        """
+        Drop all cached points. Counters are kept.
+        """
+        self._points.clear()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        :returns: Counters hits, misses, evictions and current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._points),
+        }
@@ -1,22 +1,162 @@
+from collections import OrderedDict
 from hashlib import sha256 as _sha256
-from .lsh256 import LSHDigest
+from typing import Callable, Optional, Tuple
+from .lsh256 import LSH256
+from .lsh256_backends import select_backend
 
 
-def lsh256(message: bytes) -> str:
-    """
-    Calculate LSH 256 hash digest in hex string form.
+class HashFunction:
+    def __init__(
+        self,
+        name: str,
+        digest: Callable[[bytes], bytes],
+        digest_size: int,
+        block_size: int,
+    ):
+        """
+        Initialize a hash function. Calling the object gives the digest in hex
+        string form, and digest() gives the raw digest bytes.
 
-    :param message: Message to get hash from.
-    :returns: Hash digest in hex string form.
-    """
-    return LSHDigest.digest(data=message).hex()
+        :param name: Name of the hash function.
+        :param digest: Function calculating the raw digest of a message.
+        :param digest_size: Length of the digest in bytes.
+        :param block_size: Internal block length in bytes, used by HMAC.
+        """
+        self.name = name
+        self.digest = digest
+        self.digest_size = digest_size
+        self.block_size = block_size
+
+    def __call__(self, message: bytes) -> str:
+        """
+        Calculate hash digest in hex string form.
+
+        :param message: Message to get hash from.
+        :returns: Hash digest in hex string form.
+        """
+        return self.digest(message).hex()
+
+    def hmac(self, key: bytes, message: bytes) -> bytes:
+        """
+        Calculate HMAC (RFC 2104) of message with this hash function.
+
+        :param key: HMAC key.
+        :param message: Message to authenticate.
+        :returns: HMAC tag of digest_size bytes.
+        """
+        if len(key) > self.block_size:
+            key = self.digest(key)
+        key = key.ljust(self.block_size, b"\x00")
+        inner = self.digest(bytes(b ^ 0x36 for b in key) + message)
+        return self.digest(bytes(b ^ 0x5C for b in key) + inner)
+
+    def __repr__(self) -> str:
+        return f"HashFunction({self.name!r})"
+
+
+class DigestCache:
+    def __init__(self, maxsize: int = 1024, max_message: int = 4096):
+        """
+        Initialize a bounded LRU cache of hex digests.
+
+        Entries are keyed on the hash function and the message bytes. Looking
+        up the same bytes object again only compares identities, since bytes
+        keep their own hash.
+
+        :param maxsize: Maximum number of digests to keep.
+        :param max_message: Messages longer than this many bytes are hashed
+        without being cached, bounding the memory held by keys.
+        """
+        self.maxsize = maxsize
+        self.max_message = max_message
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._digests: "OrderedDict[Tuple[HashFunction, bytes], str]" = OrderedDict()
 
+    def lookup(self, hash_func: HashFunction, message: bytes) -> Optional[str]:
+        """
+        Get a cached digest without calculating it. Misses are not counted,
+        so a lookup miss must be followed by store.
 
-def sha256(message: bytes) -> str:
+        :param hash_func: Hash function of the digest.
+        :param message: Message of the digest.
+        :returns: Digest in hex string form, or None when it is not cached.
+        """
+        if len(message) > self.max_message:
+            return None
+        digest = self._digests.get((hash_func, message))
+        if digest is not None:
+            self.hits += 1
+            self._digests.move_to_end((hash_func, message))
+        return digest
+
+    def store(self, hash_func: HashFunction, message: bytes, digest: str) -> None:
+        """
+        Record a calculated digest, counting a miss.
+
+        :param hash_func: Hash function of the digest.
+        :param message: Message of the digest.
+        :param digest: Digest in hex string form.
+        """
+        self.misses += 1
+        if len(message) > self.max_message:
+            return
+        self._digests[(hash_func, bytes(message))] = digest
+        if len(self._digests) > self.maxsize:
+            self._digests.popitem(last=False)
+            self.evictions += 1
+
+    def __call__(self, hash_func: HashFunction, message: bytes) -> str:
+        """
+        Calculate a digest in hex string form, reusing the cached one if
+        present.
+
+        :param hash_func: Hash function to use.
+        :param message: Message to get hash from.
+        :returns: Hash digest in hex string form.
+        """
+        digest = self.lookup(hash_func, message)
+        if digest is None:
+            digest = hash_func(message)
+            self.store(hash_func, message, digest)
+        return digest
+
+    def clear(self) -> None:
+        """
+        Drop all cached digests. Counters are kept.
+        """
+        self._digests.clear()
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        :returns: Counters hits, misses, evictions and current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._digests),
+        }
+
+
+def _sha256_digest(message: bytes) -> bytes:
     """
-    Calculate SHA256 hash digest in hex string form.
+    Calculate SHA256 hash digest.
 
     :param message: Message to get hash from.
-    :returns: Hash digest in hex string form.
+    :returns: Hash digest.
     """
-    return _sha256(message).hexdigest()
+    return _sha256(message).digest()
+
+
+# Name of the LSH-256 backend in use, chosen once at import time. See
+# lsh256_backends for the environment variables overriding the choice.
+lsh256_backend, _lsh256_digest = select_backend()
+lsh256 = HashFunction("lsh256", _lsh256_digest, 32, LSH256().get_blocksize())
+sha256 = HashFunction("sha256", _sha256_digest, 32, 64)
@@ -0,0 +1,298 @@
+import ctypes
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+from .lsh256 import LSH256, LSHDigest
+
+# A backend calculates the raw LSH-256 digest of a message.
+Digest = Callable[[bytes], bytes]
+
+# Environment variable naming the backend to use instead of the fastest one.
+BACKEND_ENV = "STACK_PROCESSOR_LSH256_BACKEND"
+
+# Environment variable with the path of the native library, overriding
+# native/liblsh256.so next to this module.
+LIBRARY_ENV = "STACK_PROCESSOR_LSH256_LIBRARY"
+
+# Known answers (message, digest) every backend must reproduce when it is
+# loaded: the vector of tests/test_lsh_hash.py, and messages on both sides of
+# the first block boundary, whose digests come from the reference
+# implementation. self_test can also cross-check a backend against the
+# reference implementation on more lengths, which the tests do.
+VECTORS = [
+    (b"abc", "5fbf365daea5446a7053c52b57404d77a07a5f48a1f7c1963a0898ba1b714741"),
+    (
+        bytes(range(127)),
+        "d41fe0a7e2a47d78424039aa77e9558632276f8e025cdeab945022cd471476fa",
+    ),
+    (
+        bytes(range(128)),
+        "2d44a90b60f696e8fa4bb25432e22deba1d9775cff5606dba2545d17e2d4bf9a",
+    ),
+]
+CROSS_CHECK_LENGTHS = (0, 1, 3, 127, 128, 129, 255, 256, 1000)
+
+
+def _reference_digest(message: bytes) -> bytes:
+    """
+    Calculate LSH-256 with the reference implementation in lsh256.py.
+
+    :param message: Message to get hash from.
+    :returns: Hash digest.
+    """
+    return bytes(LSHDigest.digest(data=message))
+
+
+_IV = LSH256(256)._cv[:]
+_STEP_CONSTANTS = [tuple(LSH256._STEP[8 * i : 8 * i + 8]) for i in range(26)]
+_BLOCK = struct.Struct("<32L")
+_OUTPUT = struct.Struct("<8L")
+_MASK = 0xFFFFFFFF
+
+# Word order of the second addend in the message expansion.
+_TAU = (3, 2, 0, 1, 7, 4, 5, 6, 11, 10, 8, 9, 15, 12, 13, 14)
+
+
+def _compress(cv: List[int], block: Tuple[int, ...]) -> List[int]:
+    """
+    LSH-256 compression function with the steps unrolled over local
+    variables. It follows lsh256.py step by step.
+
+    :param cv: Chaining variable of 16 words.
+    :param block: Message block of 32 little-endian words.
+    :returns: The next chaining variable.
+    """
+    m0 = block[:16]
+    m1 = block[16:]
+    for i in range(26):
+        if i >= 2:
+            m0, m1 = m1, (
+                (m1[0] + m0[3]) & _MASK,
+                (m1[1] + m0[2]) & _MASK,
+                (m1[2] + m0[0]) & _MASK,
+                (m1[3] + m0[1]) & _MASK,
+                (m1[4] + m0[7]) & _MASK,
+                (m1[5] + m0[4]) & _MASK,
+                (m1[6] + m0[5]) & _MASK,
+                (m1[7] + m0[6]) & _MASK,
+                (m1[8] + m0[11]) & _MASK,
+                (m1[9] + m0[10]) & _MASK,
+                (m1[10] + m0[8]) & _MASK,
+                (m1[11] + m0[9]) & _MASK,
+                (m1[12] + m0[15]) & _MASK,
+                (m1[13] + m0[12]) & _MASK,
+                (m1[14] + m0[13]) & _MASK,
+                (m1[15] + m0[14]) & _MASK,
+            )
+            m = m1
+        else:
+            m = m1 if i else m0
+        if i & 1:
+            alpha, alpha_r, beta, beta_r = 5, 27, 17, 15
+        else:
+            alpha, alpha_r, beta, beta_r = 29, 3, 1, 31
+        sc = _STEP_CONSTANTS[i]
+        t = [0] * 16
+        for c in range(8):
+            vl = cv[c] ^ m[c]
+            vr = cv[c + 8] ^ m[c + 8]
+            x = (vl + vr) & _MASK
+            vl = (((x << alpha) | (x >> alpha_r)) & _MASK) ^ sc[c]
+            x = (vl + vr) & _MASK
+            vr = ((x << beta) | (x >> beta_r)) & _MASK
+            t[c] = (vl + vr) & _MASK
+            t[c + 8] = vr
+        # Rotations by gamma = 0, 8, 16, 24, 24, 16, 8, 0.
+        t[9] = ((t[9] << 8) | (t[9] >> 24)) & _MASK
+        t[10] = ((t[10] << 16) | (t[10] >> 16)) & _MASK
+        t[11] = ((t[11] << 24) | (t[11] >> 8)) & _MASK
+        t[12] = ((t[12] << 24) | (t[12] >> 8)) & _MASK
+        t[13] = ((t[13] << 16) | (t[13] >> 16)) & _MASK
+        t[14] = ((t[14] << 8) | (t[14] >> 24)) & _MASK
+        cv = [
+            t[6],
+            t[4],
+            t[5],
+            t[7],
+            t[12],
+            t[15],
+            t[14],
+            t[13],
+            t[2],
+            t[0],
+            t[1],
+            t[3],
+            t[8],
+            t[11],
+            t[10],
+            t[9],
+        ]
+    # Final message addition uses the 27th expanded message.
+    m = tuple((m1[j] + m0[k]) & _MASK for j, k in enumerate(_TAU))
+    return [cv[j] ^ m[j] for j in range(16)]
+
+
+def _python_digest(message: bytes) -> bytes:
+    """
+    Calculate LSH-256 with the unrolled pure Python implementation.
+
+    :param message: Message to get hash from.
+    :returns: Hash digest.
+    """
+    padded = bytes(message) + b"\x80"
+    padded += bytes(-len(padded) % 128)
+    cv = _IV
+    for offset in range(0, len(padded), 128):
+        cv = _compress(cv, _BLOCK.unpack_from(padded, offset))
+    return _OUTPUT.pack(*(cv[i] ^ cv[i + 8] for i in range(8)))
+
+
+# The native library, loaded by _load_native.
+_native_lib: Optional[ctypes.CDLL] = None
+
+
+def _native_digest(message: bytes) -> bytes:
+    """
+    Calculate LSH-256 with the native library. Being a module-level function,
+    it can be pickled and sent to worker processes, which load the library
+    again on first use.
+
+    :param message: Message to get hash from.
+    :returns: Hash digest.
+    """
+    lib = _native_lib if _native_lib is not None else _load_native_library()
+    message = bytes(message)
+    digest = ctypes.create_string_buffer(32)
+    lib.lsh256_digest(message, len(message), digest)
+    return digest.raw
+
+
+def _load_native_library() -> ctypes.CDLL:
+    """
+    Load the native library built from native/lsh256.c.
+
+    :returns: The library.
+    :raises OSError: OSError is raised when the library cannot be loaded.
+    """
+    global _native_lib
+    path = os.environ.get(LIBRARY_ENV) or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "native", "liblsh256.so"
+    )
+    lib = ctypes.CDLL(path)
+    lib.lsh256_digest.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p]
+    lib.lsh256_digest.restype = None
+    _native_lib = lib
+    return lib
+
+
+def _load_native() -> Digest:
+    """
+    Loader of the native backend.
+
+    :returns: Digest function of the native library.
+    :raises OSError: OSError is raised when the library cannot be loaded.
+    """
+    _load_native_library()
+    return _native_digest
+
+
+# Loaders of the backends, fastest first. A loader returns the digest
+# function or raises ImportError, OSError or AttributeError when the backend
+# is unavailable.
+_backends: Dict[str, Callable[[], Digest]] = {
+    "native": _load_native,
+    "python": lambda: _python_digest,
+    "reference": lambda: _reference_digest,
+}
+
+
+def register_backend(name: str, loader: Callable[[], Digest], fastest=False):
+    """
+    Register an LSH-256 backend.
+
+    :param name: Name of the backend, as used in the environment variable.
+    :param loader: Function returning the digest function of the backend, or
+    raising ImportError, OSError or AttributeError when it is unavailable.
+    :param fastest: Optional. Whether to prefer the backend over all
+    registered ones. Otherwise it is preferred over none of them.
+    """
+    global _backends
+    _backends.pop(name, None)
+    if fastest:
+        _backends = {name: loader, **_backends}
+    else:
+        _backends[name] = loader
+
+
+def backend_names() -> List[str]:
+    """
+    Get the names of the registered backends, fastest first.
+
+    :returns: Names of the backends.
+    """
+    return list(_backends)
+
+
+def self_test(digest: Digest, cross_check: bool = True) -> bool:
+    """
+    Check a backend against the known answers and, byte for byte, against the
+    reference implementation.
+
+    :param digest: Digest function of the backend.
+    :param cross_check: Optional. Whether to compare with the reference
+    implementation too. It takes a few milliseconds, so backends are only
+    checked against the known answers when selected.
+    :returns: Whether the backend passed.
+    """
+    for message, expected in VECTORS:
+        if digest(message).hex() != expected:
+            return False
+    if not cross_check:
+        return True
+    pattern = bytes(range(256)) * 4
+    for length in CROSS_CHECK_LENGTHS:
+        if digest(pattern[:length]) != _reference_digest(pattern[:length]):
+            return False
+    return True
+
+
+def load_backend(name: str) -> Digest:
+    """
+    Load a backend and check it against the known answers.
+
+    :param name: Name of the backend.
+    :returns: Digest function of the backend.
+    :raises ValueError: ValueError is raised when the backend is unknown,
+    unavailable or fails the known answer test.
+    """
+    if name not in _backends:
+        raise ValueError(f"unknown LSH-256 backend {name!r}")
+    try:
+        digest = _backends[name]()
+    except (ImportError, OSError, AttributeError) as e:
+        raise ValueError(f"LSH-256 backend {name!r} is unavailable: {e}")
+    if not self_test(digest, cross_check=False):
+        raise ValueError(f"LSH-256 backend {name!r} failed the known answer test")
+    return digest
+
+
+def select_backend(name: Optional[str] = None) -> Tuple[str, Digest]:
+    """
+    Select an LSH-256 backend. Without a name, the one in the environment
+    variable STACK_PROCESSOR_LSH256_BACKEND is used if set, otherwise the
+    fastest backend that loads and reproduces the known answers.
+
+    :param name: Optional. Name of the backend to use.
+    :returns: Name and digest function of the selected backend.
+    :raises ValueError: ValueError is raised when the requested backend
+    cannot be used.
+    """
+    name = name or os.environ.get(BACKEND_ENV)
+    if name:
+        return name, load_backend(name)
+    for candidate in _backends:
+        try:
+            return candidate, load_backend(candidate)
+        except ValueError:
+            continue
+    raise ValueError("no LSH-256 backend is available")
@@ -0,0 +1,23 @@
+from typing import Optional, Tuple
+
+# A verification job as sent to the workers: (message, r, s, public key),
+# where the public key is its SEC 1 octet string in bytes.
+Job = Tuple[bytes, int, int, bytes]
+
+
+class PendingSig:
+    __slots__ = ("job", "result", "error")
+
+    def __init__(self, job: Job):
+        """
+        Initialize a placeholder for the result of a deferred OP_CheckSig.
+
+        :param job: The signature check (message, r, s, public key octets).
+        """
+        self.job = job
+        self.result: Optional[bool] = None
+        # Exception raised decoding the public key, failing the check.
+        self.error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        return f"PendingSig(result={self.result})"
@@ -1,13 +1,236 @@
 from asn1crypto.core import Integer, OctetBitString, Sequence
 from base64 import b64decode
 from collections import deque
-from typing import List
-from .hashes import lsh256
+from itertools import islice
+from math import inf
+from time import monotonic, perf_counter
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+from .hashes import DigestCache, lsh256
 from .ecdsa.ecdsa import ECDSA
 from .ecdsa.curveparam import secp256r1
-from .ecdsa.curvepoint import CurvePoint
+from .ecdsa.pointcache import PointCache
+from .pending import PendingSig
+from .profiling import ExecutionStats
 import binascii
 
+# Decoded public keys shared by every StackProcessor by default.
+pubkey_cache = PointCache(secp256r1)
+
+# Opcodes of compiled programs.
+OP_PUSH = 0
+OP_ADD = 1
+OP_EQUAL = 2
+OP_EQUALVERIFY = 3
+OP_DUP = 4
+OP_HASH = 5
+OP_CHECKSIG = 6
+OP_INVALID = 7
+
+# Opcode of each command token.
+OPCODES = {
+    "ADD": OP_ADD,
+    "EQUAL": OP_EQUAL,
+    "OP_EqualVerify": OP_EQUALVERIFY,
+    "OP_DUP": OP_DUP,
+    "OP_HASH": OP_HASH,
+    "OP_CheckSig": OP_CHECKSIG,
+}
+
+# Name of each opcode, as reported in execution statistics.
+OPCODE_NAMES = (
+    "PUSH",
+    "ADD",
+    "EQUAL",
+    "OP_EqualVerify",
+    "OP_DUP",
+    "OP_HASH",
+    "OP_CheckSig",
+    "INVALID",
+)
+
+# Number of stack items each opcode consumes.
+ARITY = (0, 2, 2, 2, 1, 1, 3, 0)
+
+
+class CostModel(NamedTuple):
+    # Cost of each opcode, charged before it runs. The unit is roughly the
+    # time of a simple instruction; a signature check costs about 30000.
+    weights: Tuple[int, ...] = (1, 1, 1, 1, 1, 0, 30000, 0)
+    # Cost of OP_HASH per started block of the hash function.
+    hash_block: int = 3000
+    # Cost of ADD concatenating byte strings per 64 bytes of its result.
+    concat_block: int = 1
+
+
+DEFAULT_COST_MODEL = CostModel()
+
+
+class BudgetExceeded(RuntimeError):
+    def __init__(self, cost: int, budget: int):
+        """
+        Initialize the error raised when a run exceeds its cost budget.
+
+        :param cost: Cost the run would have consumed.
+        :param budget: Budget of the run.
+        """
+        super().__init__(f"cost {cost} exceeds budget {budget}")
+        self.cost = cost
+        self.budget = budget
+
+
+# A compiled instruction (opcode, operand). The operand is the decoded literal
+# for OP_PUSH, the token for OP_INVALID, and None otherwise.
+Instruction = Tuple[int, Any]
+
+# A trace callback, called with every instruction and the stack before it.
+Trace = Callable[[Instruction, "deque[Any]"], None]
+
+
+# Static types of stack items. Booleans are results of EQUAL and OP_CheckSig.
+T_INT = "int"
+T_BOOL = "bool"
+T_BYTES = "bytes"
+T_SIG = "sig"
+T_PUBKEY = "pubkey"
+
+
+class Analysis(NamedTuple):
+    # Maximum stack depth reached by the program.
+    max_depth: int
+    # Static types of the final stack, bottom first, unless the program halts.
+    types: Tuple[str, ...]
+
+
+class Program:
+    __slots__ = ("instructions", "_analysis")
+
+    def __init__(self, instructions: Iterable[Instruction]):
+        """
+        Initialize a compiled program. Programs are immutable and can be run
+        any number of times.
+
+        :param instructions: Compiled instructions.
+        """
+        self.instructions: Tuple[Instruction, ...] = tuple(instructions)
+        self._analysis: Optional[Analysis] = None
+
+    def __iter__(self) -> Iterator[Instruction]:
+        return iter(self.instructions)
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def __add__(self, another: "Program") -> "Program":
+        """
+        Concatenate two programs, e.g. an input script and a script template.
+
+        :param another: The program to run after this one.
+        :returns: Concatenated program.
+        """
+        return Program(self.instructions + another.instructions)
+
+    def analyze(self) -> Analysis:
+        """
+        Check the program statically, without running it. Every instruction
+        must find enough operands of valid types on the stack: ADD takes two
+        numbers or two byte strings, OP_HASH a byte string or a public key,
+        and OP_CheckSig a byte string message, a signature and a public key.
+        The result is computed once per program.
+
+        :returns: Maximum stack depth and the types of the final stack.
+        :raises ValueError: ValueError is raised when an instruction would
+        underflow the stack, get operands of invalid types, or is unknown.
+        """
+        if self._analysis is None:
+            self._analysis = _analyze(self.instructions)
+        return self._analysis
+
+    def __reduce__(self):
+        # asn1crypto values do not survive pickling intact, so DER literals
+        # are pickled as their encoding and parsed again when loaded.
+        return (
+            _load_program,
+            (
+                tuple(
+                    (
+                        (opcode, operand.dump(), True)
+                        if type(operand) == StackProcessor.PubkeyDER
+                        else (opcode, operand, False)
+                    )
+                    for opcode, operand in self.instructions
+                ),
+            ),
+        )
+
+
+def _literal_type(value: Any) -> str:
+    if type(value) == int:
+        return T_INT
+    if type(value) == bytes:
+        return T_BYTES
+    if type(value) == tuple:
+        return T_SIG
+    return T_PUBKEY
+
+
+def _analyze(instructions: Tuple[Instruction, ...]) -> Analysis:
+    stack: List[str] = []
+    max_depth = 0
+    for index, (opcode, operand) in enumerate(instructions):
+        if opcode == OP_INVALID:
+            raise ValueError(f"instruction {index}: unknown command {operand!r}")
+        name = OPCODE_NAMES[opcode]
+        arity = ARITY[opcode]
+        if len(stack) < arity:
+            raise ValueError(f"instruction {index} ({name}): stack underflow")
+        operands = tuple(stack[len(stack) - arity :])
+        del stack[len(stack) - arity :]
+        if opcode == OP_PUSH:
+            stack.append(_literal_type(operand))
+        elif opcode == OP_DUP:
+            stack += operands * 2
+        elif opcode == OP_EQUAL:
+            stack.append(T_BOOL)
+        elif opcode == OP_EQUALVERIFY:
+            pass
+        elif opcode == OP_ADD and set(operands) <= {T_INT, T_BOOL}:
+            stack.append(T_INT)
+        elif opcode == OP_ADD and operands == (T_BYTES, T_BYTES):
+            stack.append(T_BYTES)
+        elif opcode == OP_HASH and operands[0] in (T_BYTES, T_PUBKEY):
+            stack.append(T_BYTES)
+        elif opcode == OP_CHECKSIG and operands == (T_BYTES, T_SIG, T_PUBKEY):
+            stack.append(T_BOOL)
+        else:
+            raise ValueError(
+                f"instruction {index} ({name}): invalid operand types "
+                + ", ".join(operands)
+            )
+        max_depth = max(max_depth, len(stack))
+    return Analysis(max_depth, tuple(stack))
+
+
+def _load_program(instructions: Tuple[Tuple[int, Any, bool], ...]) -> Program:
+    loaded = []
+    for opcode, operand, is_der in instructions:
+        if is_der:
+            operand = StackProcessor.PubkeyDER.load(operand)
+            operand["pubkey"].native  # parse the DER structure now
+        loaded.append((opcode, operand))
+    return Program(loaded)
+
 
 class StackProcessor:
     class Signature(Sequence):
@@ -16,15 +239,92 @@ class StackProcessor:
     class PubkeyDER(Sequence):
         _fields = [("curveinfo", Sequence), ("pubkey", OctetBitString)]
 
-    def __init__(self, data: List[str], hash_func=lsh256, verbose=False):
+    def __init__(
+        self,
+        data: Union[List[str], Program, Iterable[str], TextIO],
+        hash_func=lsh256,
+        verbose=False,
+        point_cache: PointCache = pubkey_cache,
+        deferred=False,
+        trace: Optional[Trace] = None,
+        profile: Optional[ExecutionStats] = None,
+        checked=False,
+        budget: Optional[int] = None,
+        cost_model: CostModel = DEFAULT_COST_MODEL,
+        digest_cache: Optional[DigestCache] = None,
+        deadline: Optional[float] = None,
+    ):
+        """
+        Initialize a stack processor.
+
+        :param data: Tokens of the program as a list, a compiled program, or
+        a token stream. A stream is any other iterable of tokens, or a text
+        file holding one token per line. Streams are compiled while they are
+        executed and never kept, so memory is bounded by the stack depth, but
+        they can only be run once.
+        :param hash_func: Optional. Hash function OP_HASH and OP_CheckSig use.
+        :param verbose: Optional. Whether to print the stack before every
+        instruction.
+        :param point_cache: Optional. Cache of decoded public keys.
+        :param deferred: Optional. Whether OP_CheckSig pushes a PendingSig to
+        be resolved by a batch verifier instead of verifying at once. A
+        placeholder consumed by a later instruction is verified eagerly.
+        :param trace: Optional. Callback called with every instruction and the
+        stack before it. Overrides verbose.
+        :param profile: Optional. Statistics every run is recorded into. When
+        omitted, nothing is timed.
+        :param checked: Optional. Whether to reject the program with
+        Program.analyze before running it. Streams cannot be checked.
+        :param budget: Optional. Maximum cost of a run. Execution is aborted
+        before the instruction that would exceed it.
+        :param cost_model: Optional. Costs of the instructions.
+        :param digest_cache: Optional. Cache of OP_HASH digests, which can be
+        shared between processors. Cached digests are still charged in full,
+        so costs do not depend on the cache.
+        :param deadline: Optional. time.monotonic() value after which execution
+        is aborted before the next instruction.
+        :raises TypeError: TypeError is raised when a stream is to be checked.
+        """
         self.data = data
+        self.program = data if isinstance(data, Program) else None
         self.hash_func = hash_func
+        self.point_cache = point_cache
         self.halt = False
         self.verbose = verbose
+        if trace is None and verbose:
+            trace = StackProcessor.__print_stack
+        self.trace = trace
+        self.profile = profile
+        self.checked = checked
+        if checked and not isinstance(data, (list, Program)):
+            raise TypeError("only token lists and programs can be checked")
+        self.deferred = deferred
+        self.pending: List[PendingSig] = []
+        self.budget = budget
+        self.cost_model = cost_model
+        self.digest_cache = digest_cache
+        self.deadline = deadline
+        self.cost = 0
+        self.__handlers = (
+            None,
+            self.__add,
+            self.__equal,
+            self.__equalverify,
+            self.__dup,
+            self.__hash,
+            self.__check_sig,
+        )
+
+    def __charge(self, cost: int):
+        self.cost += cost
+        if self.budget is not None and self.cost > self.budget:
+            raise BudgetExceeded(self.cost, self.budget)
 
     def __add(self):
         op1 = self.stack.pop()
         op2 = self.stack.pop()
+        if type(op1) == bytes and type(op2) == bytes:
+            self.__charge(self.cost_model.concat_block * ((len(op1) + len(op2)) // 64))
         self.stack.append(op1 + op2)
 
     def __equal(self):
@@ -45,20 +345,56 @@ class StackProcessor:
     def __hash(self):
         op = self.stack.pop()
         if type(op) == StackProcessor.PubkeyDER:
-            self.stack.append(self.hash_func(op.dump()).encode("utf-8"))
-        else:
-            self.stack.append(self.hash_func(op).encode("utf-8"))
+            op = op.dump()
+        if type(op) == bytes:
+            blocks = len(op) // getattr(self.hash_func, "block_size", 64) + 1
+            self.__charge(self.cost_model.hash_block * blocks)
+        cache = self.digest_cache if type(op) == bytes else None
+        digest = None if cache is None else cache.lookup(self.hash_func, op)
+        if cache is not None and self.profile is not None:
+            self.profile.digest_lookup(digest is not None)
+        if digest is None:
+            if self.profile is None:
+                digest = self.hash_func(op)
+            else:
+                start = perf_counter()
+                digest = self.hash_func(op)
+                self.profile.hash(perf_counter() - start, len(op))
+            if cache is not None:
+                cache.store(self.hash_func, op, digest)
+        self.stack.append(digest.encode("utf-8"))
 
     def __check_sig(self):
         pubkey = self.stack.pop()
         signature = self.stack.pop()
         message = self.stack.pop()
-        ecdsa = ECDSA(
-            secp256r1,
-            self.hash_func,
-            (None, CurvePoint(secp256r1, octet_str=pubkey["pubkey"].native.hex())),
+        octets = pubkey["pubkey"].native
+        if self.deferred and type(message) == bytes:
+            pending = PendingSig((message, signature[0], signature[1], octets))
+            self.pending.append(pending)
+            self.stack.append(pending)
+        else:
+            self.stack.append(self.__verify(message, signature, octets))
+
+    def __verify(self, message, signature, octets: bytes) -> bool:
+        ecdsa = ECDSA(secp256r1, self.hash_func, (None, self.point_cache.get(octets)))
+        if self.profile is None:
+            return ecdsa.verify_sign(message, signature)
+        start = perf_counter()
+        result = ecdsa.verify_sign(message, signature)
+        self.profile.sig(perf_counter() - start)
+        return result
+
+    def __resolve_pending(self):
+        # Fall back to eager verification, since the next instruction depends
+        # on the result of a deferred signature check.
+        for pending in self.pending:
+            message, r, s, octets = pending.job
+            pending.result = self.__verify(message, (r, s), octets)
+        self.pending.clear()
+        self.stack = deque(
+            item.result if type(item) == PendingSig else item for item in self.stack
         )
-        self.stack.append(ecdsa.verify_sign(message, signature))
 
     @staticmethod
     def __parse_data(data: str):
@@ -92,30 +428,127 @@ class StackProcessor:
             return pubkey
         return data
 
+    @staticmethod
+    def compile(data: Iterable[str]) -> Program:
+        """
+        Compile a program once, decoding all literals, so that it can be run
+        many times without parsing.
+
+        :param data: Tokens of the program.
+        :returns: Compiled program.
+        """
+        return Program(StackProcessor.compile_token(token) for token in data)
+
+    @staticmethod
+    def compile_token(token: str) -> Instruction:
+        """
+        Compile a single token.
+
+        :param token: Token to compile.
+        :returns: Compiled instruction. Unknown commands compile to OP_INVALID,
+        which raises KeyError when executed.
+        """
+        parsed = StackProcessor.__parse_data(token)
+        if type(parsed) in (int, bytes, tuple, StackProcessor.PubkeyDER):
+            if type(parsed) == StackProcessor.PubkeyDER:
+                parsed["pubkey"].native  # parse the DER structure now
+            return (OP_PUSH, parsed)
+        if parsed in OPCODES:
+            return (OPCODES[parsed], None)
+        return (OP_INVALID, parsed)
+
+    @staticmethod
+    def __print_stack(instruction: Instruction, stack: "deque[Any]"):
+        print(stack)
+
+    def __instructions(self) -> Iterable[Instruction]:
+        if self.program is None and isinstance(self.data, list):
+            start = perf_counter()
+            self.program = StackProcessor.compile(self.data)
+            if self.profile is not None:
+                self.profile.parse(perf_counter() - start)
+        if self.program is not None:
+            if self.checked:
+                self.program.analyze()
+            return self.program.instructions
+        tokens: Iterable[str] = self.data
+        if hasattr(tokens, "read"):
+            tokens = (line.strip() for line in tokens)
+        if self.profile is not None:
+            return map(self.__compile_token_timed, tokens)
+        return map(StackProcessor.compile_token, tokens)
+
+    def __compile_token_timed(self, token: str) -> Instruction:
+        start = perf_counter()
+        instruction = StackProcessor.compile_token(token)
+        self.profile.parse(perf_counter() - start)  # type: ignore
+        return instruction
+
     def run(self):
         """
         Run the stack processor.
 
         :returns: Execution result.
         :raises KeyError: Raises KeyError when command is invalid.
+        :raises ValueError: Raises ValueError when the processor is checked and
+        the program is rejected by Program.analyze.
+        :raises BudgetExceeded: Raises BudgetExceeded when the next instruction
+        would exceed the budget. The consumed cost is kept in cost either way.
+        :raises TimeoutError: Raises TimeoutError when the deadline passes.
+        """
+        for instruction, stack in self.__execute(self.trace is not None):
+            self.trace(instruction, stack)  # type: ignore
+        return self.stack
+
+    def steps(self) -> Generator[Tuple[Instruction, "deque[Any]"], None, Any]:
+        """
+        Run the stack processor step by step.
+
+        :returns: Generator yielding every instruction with the stack before
+        it. The stack is the live stack, not a copy. The generator returns the
+        execution result.
+        :raises KeyError: Raises KeyError when command is invalid.
         """
+        yield from self.__execute(True)
+        return self.stack
+
+    def __execute(self, tracing: bool):
+        handlers = self.__handlers
+        profile = self.profile
+        weights = self.cost_model.weights
+        budget = inf if self.budget is None else self.budget
+        deadline = self.deadline
+        self.halt = False
+        self.pending = []
         self.stack = deque()
-        for elem in self.data:
-            if self.halt:
-                return deque([False])
-            if self.verbose:
-                print(self.stack)
-            parsed = self.__parse_data(elem)
-            if type(parsed) in (int, bytes, tuple, StackProcessor.PubkeyDER):
-                self.stack.append(parsed)
+        self.cost = 0
+        for opcode, operand in self.__instructions():
+            if tracing:
+                yield (opcode, operand), self.stack
+            self.cost += weights[opcode]
+            if self.cost > budget:
+                raise BudgetExceeded(self.cost, self.budget)  # type: ignore
+            if deadline is not None and monotonic() > deadline:
+                raise TimeoutError("deadline exceeded")
+            if profile is not None:
+                start = perf_counter()
+            if opcode == OP_PUSH:
+                self.stack.append(operand)
+            elif opcode == OP_INVALID:
+                raise KeyError(operand)
             else:
-                cmd_table = {
-                    "ADD": self.__add,
-                    "EQUAL": self.__equal,
-                    "OP_EqualVerify": self.__equalverify,
-                    "OP_DUP": self.__dup,
-                    "OP_HASH": self.__hash,
-                    "OP_CheckSig": self.__check_sig,
-                }
-                cmd_table[parsed]()  # type: ignore
-        return self.stack
+                if self.pending and any(
+                    type(item) == PendingSig
+                    for item in islice(reversed(self.stack), ARITY[opcode])
+                ):
+                    self.__resolve_pending()
+                handlers[opcode]()
+            if profile is not None:
+                elapsed = perf_counter() - start
+                profile.instruction(OPCODE_NAMES[opcode], elapsed, len(self.stack))
+            if self.halt:
+                # OP_EqualVerify failed, so the script fails without running
+                # the rest of it.
+                self.pending = []
+                self.stack = deque([False])
+                return
@@ -0,0 +1,115 @@
+from typing import Dict
+
+
+class ExecutionStats:
+    def __init__(self):
+        """
+        Initialize empty execution statistics.
+
+        A StackProcessor given an ExecutionStats as profile reports every
+        event to it through the methods below. Subclasses can override them to
+        receive the events as callbacks, calling the base method to keep the
+        statistics.
+        """
+        self.counts: Dict[str, int] = {}
+        self.times: Dict[str, float] = {}
+        self.parse_time = 0.0
+        self.hash_time = 0.0
+        self.hash_bytes = 0
+        self.sig_time = 0.0
+        self.sig_checks = 0
+        self.digest_hits = 0
+        self.digest_misses = 0
+        self.max_depth = 0
+
+    def instruction(self, name: str, elapsed: float, depth: int) -> None:
+        """
+        Record an executed instruction.
+
+        :param name: Name of the opcode.
+        :param elapsed: Wall time of the instruction in seconds.
+        :param depth: Stack depth after the instruction.
+        """
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.times[name] = self.times.get(name, 0.0) + elapsed
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def parse(self, elapsed: float) -> None:
+        """
+        Record time spent compiling tokens and decoding literals.
+
+        :param elapsed: Wall time in seconds.
+        """
+        self.parse_time += elapsed
+
+    def hash(self, elapsed: float, size: int) -> None:
+        """
+        Record a call of the hash function by OP_HASH.
+
+        :param elapsed: Wall time of the call in seconds.
+        :param size: Length of the hashed message in bytes.
+        """
+        self.hash_time += elapsed
+        self.hash_bytes += size
+
+    def digest_lookup(self, hit: bool) -> None:
+        """
+        Record a lookup in the digest cache by OP_HASH. Misses are followed by
+        a hash call.
+
+        :param hit: Whether the digest was cached.
+        """
+        if hit:
+            self.digest_hits += 1
+        else:
+            self.digest_misses += 1
+
+    def sig(self, elapsed: float) -> None:
+        """
+        Record an eager signature verification.
+
+        :param elapsed: Wall time of the verification in seconds.
+        """
+        self.sig_time += elapsed
+        self.sig_checks += 1
+
+    def merge(self, another: "ExecutionStats") -> None:
+        """
+        Add the statistics of another run to these.
+
+        :param another: Statistics to add.
+        """
+        for name, count in another.counts.items():
+            self.counts[name] = self.counts.get(name, 0) + count
+        for name, elapsed in another.times.items():
+            self.times[name] = self.times.get(name, 0.0) + elapsed
+        self.parse_time += another.parse_time
+        self.hash_time += another.hash_time
+        self.hash_bytes += another.hash_bytes
+        self.sig_time += another.sig_time
+        self.sig_checks += another.sig_checks
+        self.digest_hits += another.digest_hits
+        self.digest_misses += another.digest_misses
+        self.max_depth = max(self.max_depth, another.max_depth)
+
+    def to_dict(self) -> dict:
+        """
+        Get the statistics as a JSON serializable dictionary.
+
+        :returns: Dictionary of the statistics, times in seconds.
+        """
+        return {
+            "opcodes": {
+                name: {"count": count, "time": self.times[name]}
+                for name, count in self.counts.items()
+            },
+            "parse_time": self.parse_time,
+            "hash_time": self.hash_time,
+            "hash_bytes": self.hash_bytes,
+            "sig_time": self.sig_time,
+            "sig_checks": self.sig_checks,
+            "digest_hits": self.digest_hits,
+            "digest_misses": self.digest_misses,
+            "max_depth": self.max_depth,
+        }
@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Iterable, Optional
+from .processor import Program, StackProcessor
+import os
+import pickle
+import tempfile
+
+
+def script_key(data: Iterable[str]) -> str:
+    """
+    Compute the content address of a script.
+
+    Every token is length prefixed, so different tokenizations of the same
+    characters never collide.
+
+    :param data: Tokens of the script.
+    :returns: Hex encoded SHA-256 digest of the tokens.
+    """
+    h = sha256()
+    for token in data:
+        encoded = token.encode("utf-8")
+        h.update(len(encoded).to_bytes(4, "big"))
+        h.update(encoded)
+    return h.hexdigest()
+
+
+class ScriptCache:
+    def __init__(self, maxsize: int = 1024, directory: Optional[str] = None):
+        """
+        Initialize a content-addressed cache of compiled programs.
+
+        Programs are kept in a bounded in-memory LRU. When directory is given,
+        compiled programs are also pickled there, so another process sharing
+        the directory skips compilation as well. The directory must only be
+        writable by trusted users, since its files are unpickled.
+
+        :param maxsize: Maximum number of programs kept in memory.
+        :param directory: Directory of the on-disk tier, created if missing.
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._programs: "OrderedDict[str, Program]" = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, data: Iterable[str]) -> Program:
+        """
+        Get the compiled program of a script, compiling it on a miss.
+
+        :param data: Tokens of the script.
+        :returns: Compiled program.
+        """
+        data = list(data)
+        key = script_key(data)
+        program = self._programs.get(key)
+        if program is not None:
+            self.hits += 1
+            self._programs.move_to_end(key)
+            return program
+        program = self._load(key)
+        if program is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            program = StackProcessor.compile(data)
+            self._store(key, program)
+        self._programs[key] = program
+        if len(self._programs) > self.maxsize:
+            self._programs.popitem(last=False)
+            self.evictions += 1
+        return program
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pickle")  # type: ignore
+
+    def _load(self, key: str) -> Optional[Program]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                program = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Stale or foreign files may fail in any way while unpickling, so
+            # they are dropped and the script is compiled again.
+            program = None
+        if isinstance(program, Program):
+            return program
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    def _store(self, key: str, program: Program) -> None:
+        if self.directory is None:
+            return
+        # Write to a temporary file first so readers never see partial files.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(program, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def clear(self) -> None:
+        """
+        Drop all programs kept in memory. The on-disk tier and counters are
+        kept.
+        """
+        self._programs.clear()
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        :returns: Counters hits, disk_hits, misses, evictions, current size
+        and hit_rate, the fraction of lookups served without compiling.
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._programs),
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
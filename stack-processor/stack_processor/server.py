@@ -0,0 +1,421 @@
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, perf_counter
+from typing import Any, List, Optional, Set, Tuple
+from .batch import BatchResult, _portable, result_to_dict
+from .hashes import DigestCache, lsh256, sha256
+from .processor import StackProcessor
+from .script_cache import ScriptCache
+from .verification import VerificationService, resolve_deferred_async
+
+# Frames are a 4-byte big-endian length followed by a UTF-8 JSON document.
+# Requests are objects {"id": ..., "script": [tokens]}, and responses are
+# objects {"id": ..., "stack": [...], "error": ..., "cost": ...} as in batch
+# mode.
+MAX_FRAME = 16 * 1024 * 1024
+
+HASH_FUNCTIONS = {"lsh256": lsh256, "sha256": sha256}
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Any]:
+    """
+    Read a frame.
+
+    :param reader: Stream to read from.
+    :returns: Decoded JSON document, or None at the end of the stream.
+    :raises ValueError: ValueError is raised when the frame is too large or
+    is not valid JSON.
+    :raises asyncio.IncompleteReadError: Raised when the stream ends inside a
+    frame.
+    """
+    try:
+        header = await reader.readexactly(4)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    length = int.from_bytes(header, "big")
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes exceeds {MAX_FRAME} bytes")
+    return json.loads(await reader.readexactly(length))
+
+
+def write_frame(writer: asyncio.StreamWriter, document: Any) -> None:
+    """
+    Write a frame. Call writer.drain() afterwards to apply flow control.
+
+    :param writer: Stream to write to.
+    :param document: JSON serializable document to send.
+    """
+    payload = json.dumps(document).encode("utf-8")
+    writer.write(len(payload).to_bytes(4, "big") + payload)
+
+
+async def open_connection(
+    path: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Connect to a server.
+
+    :param path: Optional. Path of the Unix socket. When omitted, TCP is used.
+    :param host: Optional. Host of the TCP socket.
+    :param port: Optional. Port of the TCP socket.
+    :returns: Reader and writer of the connection.
+    """
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def submit(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    script: List[str],
+    id: Any = None,
+) -> dict:
+    """
+    Run a script on a server and wait for its result. Only one request may be
+    outstanding on a connection at a time when using this function.
+
+    :param reader: Reader of the connection.
+    :param writer: Writer of the connection.
+    :param script: Tokens of the script.
+    :param id: Optional. Identifier echoed in the response.
+    :returns: Response {"id", "stack", "error", "cost"}.
+    :raises ConnectionError: ConnectionError is raised when the server closed
+    the connection.
+    """
+    write_frame(writer, {"id": id, "script": script})
+    await writer.drain()
+    response = await read_frame(reader)
+    if response is None:
+        raise ConnectionError("connection closed by the server")
+    return response
+
+
+class ScriptServer:
+    def __init__(
+        self,
+        hash_func=lsh256,
+        max_workers: Optional[int] = None,
+        max_pending: int = 256,
+        timeout: float = 5.0,
+        cache_size: int = 1024,
+        budget: Optional[int] = 1000000,
+        digest_cache_size: int = 0,
+    ):
+        """
+        Initialize a server running submitted scripts.
+
+        Scripts are compiled through a ScriptCache, checked statically so that
+        ill-typed scripts are rejected before any work, and run on a thread
+        beside the event loop with deferred signature checks, which are
+        verified by a pool of worker processes. Checks whose results the
+        script consumes itself are verified on that thread, so they never
+        stall the event loop. Scripts stop at the deadline of their request,
+        so a slow script cannot hold the thread past its timeout. Once max_pending requests are in flight, the
+        server stops reading from its connections until one of them is done,
+        which pushes back on the clients through the socket buffers.
+
+        :param hash_func: Optional. Hash function OP_HASH and OP_CheckSig use.
+        :param max_workers: Optional. Number of verification processes.
+        Defaults to the number of CPUs.
+        :param max_pending: Optional. Maximum number of requests in flight.
+        :param timeout: Optional. Seconds a request may take from its arrival,
+        including compilation, queueing and its signature checks, before
+        failing with a timeout error.
+        :param cache_size: Optional. Number of compiled scripts kept.
+        :param budget: Optional. Cost budget of every script, None for no
+        limit. The default allows about 30 signature checks.
+        :param digest_cache_size: Optional. Number of OP_HASH digests to cache,
+        0 to disable the cache.
+        """
+        self.hash_func = hash_func
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.budget = budget
+        self.digests = DigestCache(digest_cache_size) if digest_cache_size else None
+        self.scripts = ScriptCache(cache_size)
+        self.requests = 0
+        self.timeouts = 0
+        self._service = VerificationService(
+            hash_func=hash_func, max_workers=max_workers
+        )
+        # A single thread runs the scripts, since the caches they share are
+        # not thread-safe.
+        self._runner = ThreadPoolExecutor(max_workers=1)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def handle(self, request: Any) -> dict:
+        """
+        Run a single request. It returns only once the script thread is done
+        with the request, even when it fails with a timeout.
+
+        :param request: Decoded request frame.
+        :returns: Response frame.
+        """
+        self.requests += 1
+        name = request.get("id") if isinstance(request, dict) else None
+        loop = asyncio.get_running_loop()
+        deadline = monotonic() + self.timeout
+        processor = None
+        try:
+            if not isinstance(request, dict) or not isinstance(
+                request.get("script"), list
+            ):
+                raise ValueError("expected a script record")
+            processor = await loop.run_in_executor(
+                self._runner, self._prepare, request["script"], deadline
+            )
+            stack = await loop.run_in_executor(self._runner, processor.run)
+            (stack,) = await asyncio.wait_for(
+                resolve_deferred_async([stack], self._service),
+                max(deadline - monotonic(), 0),
+            )
+        except (asyncio.TimeoutError, TimeoutError):
+            self.timeouts += 1
+            error = "TimeoutError: deadline exceeded"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            stack = [_portable(item) for item in stack]
+            return result_to_dict(BatchResult(name, stack, None, processor.cost))
+        cost = None if processor is None else processor.cost
+        return result_to_dict(BatchResult(name, None, error, cost))
+
+    def _prepare(self, script: List[str], deadline: float) -> StackProcessor:
+        """
+        Compile a script on the script thread.
+
+        :param script: Tokens of the script.
+        :param deadline: time.monotonic() value the request must finish by.
+        :returns: Processor running the script until the deadline.
+        :raises TimeoutError: Raises TimeoutError when the deadline passed
+        while the request was queued.
+        """
+        if monotonic() > deadline:
+            raise TimeoutError("deadline exceeded")
+        return StackProcessor(
+            self.scripts.get(script),
+            self.hash_func,
+            deferred=True,
+            checked=True,
+            budget=self.budget,
+            digest_cache=self.digests,
+            deadline=deadline,
+        )
+
+    async def _respond(self, request: Any, writer: asyncio.StreamWriter) -> None:
+        assert self._slots is not None
+        try:
+            write_frame(writer, await self.handle(request))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._slots.release()
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        assert self._slots is not None
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except ValueError as e:
+                    error = f"{type(e).__name__}: {e}"
+                    result = BatchResult(None, None, error)  # type: ignore
+                    write_frame(writer, result_to_dict(result))
+                    break
+                if request is None:
+                    break
+                await self._slots.acquire()
+                task = asyncio.ensure_future(self._respond(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765
+    ) -> asyncio.AbstractServer:
+        """
+        Start listening without blocking.
+
+        :param path: Optional. Path of the Unix socket. When omitted, TCP is
+        used.
+        :param host: Optional. Host of the TCP socket.
+        :param port: Optional. Port of the TCP socket, 0 for any free port.
+        :returns: The listening server.
+        """
+        self._slots = asyncio.Semaphore(self.max_pending)
+        if path is not None:
+            return await asyncio.start_unix_server(self._serve_connection, path)
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def serve(
+        self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 8765
+    ) -> None:
+        """
+        Listen and serve until cancelled.
+
+        :param path: Optional. Path of the Unix socket. When omitted, TCP is
+        used.
+        :param host: Optional. Host of the TCP socket.
+        :param port: Optional. Port of the TCP socket.
+        """
+        server = await self.start(path, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        """
+        Shut down the script thread and the verification processes.
+        """
+        self._runner.shutdown()
+        self._service.close()
+
+    def __enter__(self) -> "ScriptServer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """
+    Get a percentile of sorted values by the nearest-rank method.
+
+    :param values: Sorted values, not empty.
+    :param q: Percentile as a fraction in (0, 1].
+    :returns: The percentile.
+    """
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+async def load_test(
+    script: List[str],
+    requests: int = 1000,
+    concurrency: int = 16,
+    path: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+) -> dict:
+    """
+    Submit a script to a server many times over concurrent connections.
+
+    :param script: Tokens of the script.
+    :param requests: Optional. Total number of requests.
+    :param concurrency: Optional. Number of connections, each with one
+    request in flight.
+    :param path: Optional. Path of the Unix socket. When omitted, TCP is used.
+    :param host: Optional. Host of the TCP socket.
+    :param port: Optional. Port of the TCP socket.
+    :returns: Report with the number of requests and errors, elapsed seconds,
+    throughput in requests per second, and p50 and p99 latency in seconds.
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal errors, remaining
+        reader, writer = await open_connection(path, host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = perf_counter()
+                response = await submit(reader, writer, script)
+                latencies.append(perf_counter() - start)
+                if response["error"] is not None:
+                    errors += 1
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": _percentile(latencies, 0.5) if latencies else None,
+        "p99": _percentile(latencies, 0.99) if latencies else None,
+    }
+
+
+def main(argv: List[str]) -> None:
+    """
+    Run the serve or loadgen command.
+
+    :param argv: Command line arguments, starting with the command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m stack_processor",
+        description="Stack processor server powered by Team Crypt0newbies",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="serve scripts over a socket")
+    loadgen = commands.add_parser("loadgen", help="load test a running server")
+    for command in (serve, loadgen):
+        command.add_argument("--unix", metavar="PATH", help="Unix socket path")
+        command.add_argument("--host", default="127.0.0.1", help="TCP host")
+        command.add_argument("--port", type=int, default=8765, help="TCP port")
+    serve.add_argument(
+        "--hash", choices=sorted(HASH_FUNCTIONS), default="lsh256", help="hash"
+    )
+    serve.add_argument("--jobs", type=int, help="number of verification processes")
+    serve.add_argument(
+        "--max-pending", type=int, default=256, help="maximum requests in flight"
+    )
+    serve.add_argument(
+        "--timeout", type=float, default=5.0, help="per-request timeout in seconds"
+    )
+    serve.add_argument(
+        "--budget", type=int, default=1000000, help="per-script cost budget"
+    )
+    serve.add_argument(
+        "--digest-cache",
+        type=int,
+        default=0,
+        metavar="SIZE",
+        help="number of OP_HASH digests to cache",
+    )
+    loadgen.add_argument("filepath", help="a stack program file to submit")
+    loadgen.add_argument("--requests", type=int, default=1000)
+    loadgen.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        with ScriptServer(
+            HASH_FUNCTIONS[args.hash],
+            args.jobs,
+            args.max_pending,
+            args.timeout,
+            budget=args.budget,
+            digest_cache_size=args.digest_cache,
+        ) as server:
+            try:
+                asyncio.run(server.serve(args.unix, args.host, args.port))
+            except KeyboardInterrupt:
+                pass
+    else:
+        with open(args.filepath) as f:
+            script = [line.strip() for line in f]
+        report = asyncio.run(
+            load_test(
+                script, args.requests, args.concurrency, args.unix, args.host, args.port
+            )
+        )
+        print(json.dumps(report, indent=2))
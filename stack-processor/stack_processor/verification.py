@@ -0,0 +1,276 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Union
+from .hashes import lsh256
+from .ecdsa.curveparam import CurveParam, secp256r1
+from .ecdsa.curvepoint import CurvePoint, precompute_basepoint
+from .ecdsa.ecdsa import ECDSA
+from .ecdsa.pointcache import PointCache
+from .pending import Job, PendingSig
+
+# Outcome of a verification job: whether the signature is valid, or the
+# exception raised decoding its public key.
+Outcome = Union[bool, Exception]
+
+# Per-process verifier and public key cache, set up once by _init_worker in
+# every worker.
+_worker_ecdsa: Optional[ECDSA] = None
+_worker_pubkeys: Optional[PointCache] = None
+
+
+def _init_worker(curve: CurveParam, hash_func: Callable) -> None:
+    """
+    Set up the verifier of a worker process and warm its curve tables.
+
+    :param curve: Curve the signatures are made on.
+    :param hash_func: Hash function the signatures are made with.
+    """
+    global _worker_ecdsa, _worker_pubkeys
+    G = CurvePoint(curve, pos=curve.basepoint)
+    _worker_ecdsa = ECDSA(curve, hash_func, (None, G))
+    _worker_pubkeys = PointCache(curve)
+    precompute_basepoint(curve)
+
+
+def _verify_chunk(jobs: List[Job]) -> List[Outcome]:
+    """
+    Verify a chunk of jobs inside a worker process.
+
+    :param jobs: Jobs to verify.
+    :returns: Outcome of each job, in order.
+    """
+    assert _worker_ecdsa is not None, "worker is not initialized"
+    assert _worker_pubkeys is not None, "worker is not initialized"
+    return _verify_jobs(_worker_ecdsa, _worker_pubkeys, jobs)
+
+
+def _verify_jobs(ecdsa: ECDSA, pubkeys: PointCache, jobs: List[Job]) -> List[Outcome]:
+    """
+    Verify jobs in a single batch. A job whose public key cannot be decoded
+    fails alone, without affecting the others.
+
+    :param ecdsa: Verifier whose hash function and curve the jobs use.
+    :param pubkeys: Cache decoding the public keys of the jobs.
+    :param jobs: Jobs to verify.
+    :returns: Outcome of each job, in order.
+    """
+    results: List[Outcome] = []
+    items = []
+    indices = []
+    for message, r, s, pubkey in jobs:
+        try:
+            point = pubkeys.get(pubkey)
+        except Exception as e:
+            results.append(e)
+            continue
+        indices.append(len(results))
+        results.append(False)
+        items.append((message, (r, s), point))
+    for index, result in zip(indices, ecdsa.verify_batch(items)):
+        results[index] = result
+    return results
+
+
+def _chunks(jobs: Iterable[Job], size: int) -> Iterator[List[Job]]:
+    """
+    Split jobs into lists of at most size jobs.
+
+    :param jobs: Jobs to split.
+    :param size: Maximum number of jobs per chunk.
+    :returns: Iterator over the chunks.
+    """
+    iterator = iter(jobs)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class VerificationService:
+    def __init__(
+        self,
+        curve: CurveParam = secp256r1,
+        hash_func: Callable = lsh256,
+        max_workers: Optional[int] = None,
+        chunksize: int = 64,
+    ):
+        """
+        Initialize a pool of worker processes verifying ECDSA signatures.
+
+        :param curve: Curve the signatures are made on.
+        :param hash_func: Hash function the signatures are made with. It must
+        be picklable, e.g. a module-level function.
+        :param max_workers: Optional. Number of worker processes. Defaults to
+        the number of CPUs.
+        :param chunksize: Number of jobs sent to a worker at once.
+        """
+        self.chunksize = chunksize
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(curve, hash_func),
+        )
+
+    def map(self, jobs: Iterable[Job]) -> List[Outcome]:
+        """
+        Verify jobs, blocking until all of them are done.
+
+        :param jobs: Jobs (message, r, s, public key octets) to verify.
+        :returns: Verification result of each job, in order, or the exception
+        raised decoding its public key.
+        """
+        results = self._executor.map(_verify_chunk, _chunks(jobs, self.chunksize))
+        return list(chain.from_iterable(results))
+
+    async def verify(self, jobs: Iterable[Job]) -> List[Outcome]:
+        """
+        Verify jobs without blocking the running event loop.
+
+        :param jobs: Jobs (message, r, s, public key octets) to verify.
+        :returns: Verification result of each job, in order, or the exception
+        raised decoding its public key.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self._executor, _verify_chunk, chunk)
+            for chunk in _chunks(jobs, self.chunksize)
+        ]
+        results = await asyncio.gather(*futures)
+        return list(chain.from_iterable(results))
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes.
+        """
+        self._executor.shutdown()
+
+    def __enter__(self) -> "VerificationService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _pending_sigs(stacks: List[List[Any]]) -> List[PendingSig]:
+    """
+    Collect the unresolved placeholders of stacks, each exactly once.
+
+    :param stacks: Stacks to scan.
+    :returns: The placeholders, in order of first appearance.
+    """
+    placeholders = {}
+    for stack in stacks:
+        for item in stack:
+            if type(item) == PendingSig and item.result is None and item.error is None:
+                placeholders[id(item)] = item
+    return list(placeholders.values())
+
+
+def _settle(placeholders: List[PendingSig], results: List[Outcome]) -> None:
+    """
+    Store the outcomes of verification jobs in their placeholders.
+
+    :param placeholders: Placeholders of the jobs.
+    :param results: Outcome of each job, in order.
+    """
+    for pending, result in zip(placeholders, results):
+        if isinstance(result, Exception):
+            pending.error = result
+        else:
+            pending.result = result
+
+
+def _substitute(stack: Iterable[Any]) -> "deque[Any]":
+    """
+    Replace resolved placeholders by their results.
+
+    :param stack: Stack holding resolved placeholders.
+    :returns: The stack without placeholders.
+    :raises Exception: The exception of a failed check is raised when the
+    stack holds its placeholder, as eager verification would have.
+    """
+    resolved: "deque[Any]" = deque()
+    for item in stack:
+        if type(item) == PendingSig:
+            if item.error is not None:
+                raise item.error
+            item = item.result
+        resolved.append(item)
+    return resolved
+
+
+def _resolve(
+    stacks: Iterable[Iterable[Any]],
+    service: Optional[VerificationService] = None,
+    hash_func: Callable = lsh256,
+    pubkeys: Optional[PointCache] = None,
+) -> List[List[Any]]:
+    """
+    Verify the deferred signature checks of stacks in one batch, storing the
+    outcomes in their placeholders. The arguments are those of
+    resolve_deferred.
+
+    :returns: The stacks as lists, still holding the placeholders.
+    """
+    stacks = [list(stack) for stack in stacks]
+    placeholders = _pending_sigs(stacks)
+    jobs = [pending.job for pending in placeholders]
+    if service is not None:
+        results = service.map(jobs)
+    elif jobs:
+        curve = secp256r1 if pubkeys is None else pubkeys.curve
+        ecdsa = ECDSA(curve, hash_func, (None, CurvePoint(curve, pos=curve.basepoint)))
+        results = _verify_jobs(ecdsa, pubkeys or PointCache(curve), jobs)
+    else:
+        results = []
+    _settle(placeholders, results)
+    return stacks
+
+
+def resolve_deferred(
+    stacks: Iterable[Iterable[Any]],
+    service: Optional[VerificationService] = None,
+    hash_func: Callable = lsh256,
+    pubkeys: Optional[PointCache] = None,
+) -> List["deque[Any]"]:
+    """
+    Resolve the deferred signature checks left on the final stacks of
+    processors run with deferred=True, verifying all of them in one batch.
+
+    :param stacks: Final stacks of the processors.
+    :param service: Optional. Pool verifying the signatures. When omitted,
+    they are verified in this process.
+    :param hash_func: Optional. Hash function of the signatures, used when
+    verifying in this process.
+    :param pubkeys: Optional. Cache of decoded public keys, used when
+    verifying in this process.
+    :returns: The stacks, with every placeholder replaced by its result.
+    :raises Exception: The exception raised decoding a public key is raised
+    when a check failed that way. All other checks are resolved anyway.
+    """
+    return [
+        _substitute(stack) for stack in _resolve(stacks, service, hash_func, pubkeys)
+    ]
+
+
+async def resolve_deferred_async(
+    stacks: Iterable[Iterable[Any]], service: VerificationService
+) -> List["deque[Any]"]:
+    """
+    Resolve deferred signature checks like resolve_deferred, without blocking
+    the running event loop.
+
+    :param stacks: Final stacks of the processors.
+    :param service: Pool verifying the signatures.
+    :returns: The stacks, with every placeholder replaced by its result.
+    :raises Exception: The exception raised decoding a public key is raised
+    when a check failed that way.
+    """
+    stacks = [list(stack) for stack in stacks]
+    placeholders = _pending_sigs(stacks)
+    if placeholders:
+        results = await service.verify(pending.job for pending in placeholders)
+        _settle(placeholders, results)
+    return [_substitute(stack) for stack in stacks]
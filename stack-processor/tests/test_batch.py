@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+from stack_processor.batch import (
+    BatchResult,
+    BatchRunner,
+    read_scripts,
+    result_to_json,
+)
+from stack_processor.hashes import sha256
+from .test_processor import checksig
+
+scripts = [
+    ("add", "1 2 ADD".split()),
+    ("checksig", checksig),
+    ("invalid", "1 NOP".split()),
+    ("dup", "1 OP_DUP".split()),
+] * 3
+
+
+class TestBatchRunner(unittest.TestCase):
+    def test_run(self):
+        expected = [
+            BatchResult("add", [3], None, 3),
+            BatchResult("checksig", [True], None, 36006),
+            BatchResult("invalid", None, "KeyError: 'NOP'", 1),
+            BatchResult("dup", [1, 1], None, 2),
+        ] * 3
+        with BatchRunner(hash_func=sha256, max_workers=2, chunksize=3) as runner:
+            self.assertListEqual(list(runner.run(scripts)), expected)
+            results = list(runner.run(scripts, ordered=False))
+            self.assertCountEqual(results, expected)
+            self.assertListEqual(list(runner.run([])), [])
+        with BatchRunner(
+            hash_func=sha256, max_workers=2, chunksize=3, deferred=True
+        ) as runner:
+            self.assertListEqual(list(runner.run(scripts)), expected)
+
+    def test_bad_pubkey(self):
+        # A compressed public key whose x coordinate is not on the curve.
+        bad_pubkey = (
+            "MDkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDIgACAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+            "AAAAAAAAAAAAAAE="
+        )
+        bad = checksig[:2] + ["pubkey:" + bad_pubkey, "OP_CheckSig"]
+        batch = [("good", checksig), ("bad", bad), ("good", checksig)]
+        expected = [
+            BatchResult("good", [True], None, 36006),
+            BatchResult("bad", None, "AssertionError: not a square (mod p)", 30003),
+            BatchResult("good", [True], None, 36006),
+        ]
+        for deferred in (False, True):
+            with BatchRunner(
+                hash_func=sha256, max_workers=1, chunksize=3, deferred=deferred
+            ) as runner:
+                self.assertListEqual(list(runner.run(batch)), expected)
+
+    def test_read_scripts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scripts.jsonl")
+            with open(path, "w") as f:
+                f.write(json.dumps({"id": "add", "script": ["1", "2", "ADD"]}))
+                f.write("\n\n")
+                f.write(json.dumps({"script": ["1"]}) + "\n")
+            self.assertListEqual(
+                list(read_scripts(path)), [("add", ["1", "2", "ADD"]), ("3", ["1"])]
+            )
+            os.remove(path)
+            with open(os.path.join(directory, "b.txt"), "w") as f:
+                f.write("1\nOP_DUP\n")
+            with open(os.path.join(directory, "a.txt"), "w") as f:
+                f.write("1\n")
+            self.assertListEqual(
+                list(read_scripts(directory)),
+                [("a.txt", ["1"]), ("b.txt", ["1", "OP_DUP"])],
+            )
+
+    def test_result_to_json(self):
+        result = BatchResult("x", [b"\x00", (1, 2), True])
+        self.assertDictEqual(
+            json.loads(result_to_json(result)),
+            {
+                "id": "x",
+                "stack": ["base64:AA==", [1, 2], True],
+                "error": None,
+                "cost": None,
+            },
+        )
@@ -1,5 +1,7 @@
+import pickle
 import unittest
 from stack_processor.ecdsa.curveparam import CurveParam
+from stack_processor.ecdsa import curveparam
 
 
 class TestCurveParam(unittest.TestCase):
@@ -25,3 +27,9 @@ class TestCurveParam(unittest.TestCase):
         self.assertIsNotNone(secp256r1)
         self.assertIsNotNone(another)
         self.assertEqual(secp256r1.basepoint, another.basepoint)
+        self.assertIs(secp256r1, another)
+        self.assertIs(secp256r1, curveparam.secp256r1)
+        self.assertEqual(secp256r1.params["p"], secp256r1.p)
+        self.assertIs(pickle.loads(pickle.dumps(secp256r1)), secp256r1)
+        with self.assertRaises(AttributeError):
+            secp256r1.extra = 1
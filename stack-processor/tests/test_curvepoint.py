@@ -11,6 +11,12 @@ class TestCurvePoint(unittest.TestCase):
         self.assertEqual(P.y, 0)
         with self.assertRaises(ValueError):
             CurvePoint(secp256r1)
+        O = CurvePoint.infinity(secp256r1)
+        self.assertTrue(O.is_infinity)
+        self.assertFalse(P.is_infinity)
+        self.assertEqual(CurvePoint(secp256r1, octet_str="00"), O)
+        self.assertEqual(O.octet_str(), "00")
+        self.assertFalse(hasattr(P, "__dict__"))
 
     def test_add(self):
         P = CurvePoint(
@@ -30,7 +36,7 @@ class TestCurvePoint(unittest.TestCase):
         )
         self.assertEqual(P + P, Q)
         self.assertEqual(P + Q, R)
-        self.assertEqual(-P + P, CurvePoint(secp256r1, pos=(0, 0)))
+        self.assertEqual(-P + P, CurvePoint.infinity(secp256r1))
 
     def test_mul(self):
         P = CurvePoint(
@@ -38,11 +44,11 @@ class TestCurvePoint(unittest.TestCase):
             x=0x11952303F0F1F145671498E43980CE2539026E7234FE02388AEACCFB3A3D4DDC,
             y=0xD96D3CFE8B55BFEAC33AA1591354B3917945B73B49D90E962ADE79D349DC79CA,
         )
-        added = CurvePoint(secp256r1, pos=(0, 0))
+        added = CurvePoint.infinity(secp256r1)
         for i in range(100):
             self.assertEqual(i * P, added)
             self.assertEqual((-i) * P, -added)
-            self.assertEqual((-i) * P + i * P, CurvePoint(secp256r1, pos=(0, 0)))
+            self.assertEqual((-i) * P + i * P, CurvePoint.infinity(secp256r1))
             added += P
 
     def test_serialization(self):
@@ -55,3 +61,63 @@ class TestCurvePoint(unittest.TestCase):
                 "77037D81 2DEB33A0 F4A13945 D898C296"
             ).replace(" ", ""),
         )
+
+    def test_mul_large_scalar(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        n = secp256r1.params["n"]
+        self.assertEqual(n * G, CurvePoint.infinity(secp256r1))
+        self.assertEqual((n + 1) * G, G)
+        self.assertEqual(
+            (n - 1) * G, CurvePoint(secp256r1, x=G.x, y=-G.y % secp256r1.params["p"])
+        )
+        self.assertEqual(3 * G, G + G + G)
+
+    def test_fixed_base_mul(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        double_G = G + G
+        for k in (1, 2, 15, 16, 17, 0xDEADBEEF, secp256r1.params["n"] // 3):
+            self.assertEqual((2 * k) * G, k * double_G)
+        self.assertEqual(0 * G, CurvePoint.infinity(secp256r1))
+
+    def test_multi_mul(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        P = 0x1234567 * G
+        Q = 0x89ABCDEF * G
+        infinity = CurvePoint.infinity(secp256r1)
+        cases = ((0, 0), (1, 0), (3, 5), (-7, 11), (2 ** 200 + 1, 2 ** 255 - 19))
+        for a, b in cases:
+            self.assertEqual(CurvePoint.multi_mul((a, b), (P, Q)), a * P + b * Q)
+            self.assertEqual(CurvePoint.multi_mul((a, b), (G, Q)), a * G + b * Q)
+        self.assertEqual(CurvePoint.multi_mul((1, 1), (P, -P)), infinity)
+        self.assertEqual(CurvePoint.multi_mul((5, 2), (infinity, P)), P + P)
+        self.assertEqual(
+            CurvePoint.multi_mul((2, 3, 4), (P, Q, G)), 2 * P + 3 * Q + 4 * G
+        )
+
+    def test_mul_window_width(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        P = 0xC0FFEE * G
+        scalar = 0x0123456789ABCDEF0123456789ABCDEF0123456789ABCDEF0123456789ABCDEF
+        expected = (scalar * 0xC0FFEE) * G
+        for width in range(2, 8):
+            self.assertEqual(P.mul(scalar, width), expected)
+            self.assertEqual(P.mul(-scalar, width), -expected)
+
+    def test_multi_mul_batch(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        P = 0xBEEF * G
+        jobs = [((3, 5), (G, P)), ((1, -1), (P, P)), ((7,), (P,)), ((0, 2), (G, G))]
+        self.assertListEqual(
+            CurvePoint.multi_mul_batch(jobs),
+            [3 * G + 5 * P, CurvePoint.infinity(secp256r1), 7 * P, G + G],
+        )
+        self.assertListEqual(CurvePoint.multi_mul_batch([]), [])
+
+    def test_mul_ladder(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        P = 0xFACE * G
+        n = secp256r1.n
+        for k in (1, 2, 3, 0xDEADBEEF, n - 1, n + 5, -7, 2 ** 256 - 1):
+            self.assertEqual(P.mul_ladder(k), k * P)
+            self.assertEqual(G.mul_ladder(k), k * G)
+        self.assertEqual(P.mul_ladder(n), CurvePoint.infinity(secp256r1))
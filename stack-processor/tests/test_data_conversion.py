@@ -1,10 +1,16 @@
 import unittest
+from stack_processor.ecdsa.curveparam import secp256r1
 from stack_processor.ecdsa.data_conversion import (
     field_elem_to_octet_list,
+    int_to_octets,
     octet_list_to_field_elem,
     octet_list_to_int,
     octet_str_to_int,
     octet_str_to_octet_list,
+    octets_to_field_elem,
+    octets_to_int,
+    octets_to_point,
+    point_to_octets,
 )
 
 
@@ -29,3 +35,29 @@ class TestDataConversion(unittest.TestCase):
             field_elem_to_octet_list(0x010111223344),
             [0x01, 0x01, 0x11, 0x22, 0x33, 0x44],
         )
+
+    def test_octets(self):
+        self.assertEqual(octets_to_int(b"\x11\x22\x33\x44"), 0x11223344)
+        self.assertEqual(octets_to_int(memoryview(b"\x00\x01")), 1)
+        self.assertEqual(int_to_octets(0), b"\x00")
+        self.assertEqual(int_to_octets(0x0111223344), b"\x01\x11\x22\x33\x44")
+        self.assertEqual(int_to_octets(1, 4), b"\x00\x00\x00\x01")
+        self.assertEqual(octets_to_field_elem(b"\x02\x0f", 8191), 527)
+        with self.assertRaises(ValueError):
+            octets_to_field_elem(b"\x20\x00", 8191)
+
+    def test_point_octets(self):
+        p = secp256r1.params["p"]
+        G = secp256r1.basepoint
+        compressed = point_to_octets(G, p)
+        uncompressed = point_to_octets(G, p, compressed=False)
+        self.assertEqual(len(compressed), 33)
+        self.assertEqual(len(uncompressed), 65)
+        self.assertEqual(octets_to_point(compressed, secp256r1.params), G)
+        self.assertEqual(octets_to_point(uncompressed, secp256r1.params), G)
+        self.assertEqual(point_to_octets(None, p), b"\x00")
+        self.assertIsNone(octets_to_point(b"\x00", secp256r1.params))
+        with self.assertRaises(ValueError):
+            octets_to_point(b"\x05" + compressed[1:], secp256r1.params)
+        with self.assertRaises(ValueError):
+            octets_to_point(compressed[:-1], secp256r1.params)
@@ -2,10 +2,11 @@ import unittest
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec, utils
 
-from stack_processor.hashes import sha256
+from stack_processor.hashes import lsh256, sha256
 from stack_processor.ecdsa.ecdsa import ECDSA
 from stack_processor.ecdsa.curvepoint import CurvePoint
 from stack_processor.ecdsa.curveparam import secp256r1
+from stack_processor.ecdsa.nonce import NoncePool
 
 
 key_pair = (
@@ -28,6 +29,42 @@ class TestECDSA(unittest.TestCase):
             0xD231C993EDCB1E808A3018227051493F2E73E1FC0FB37C7C5D4A46A7A749C451,
         )
         self.assertTrue(ecdsa.verify_sign(message.encode("utf-8"), signature))
+        hex_only = ECDSA(secp256r1, lambda m: sha256(m), key_pair)
+        self.assertTrue(hex_only.verify_sign(message.encode("utf-8"), signature))
+
+    def test_verify_batch(self):
+        signature = (
+            0xE74013272166ED7216B81428E151C1F4196BCB16A442E590C63685839B32A8C9,
+            0xD231C993EDCB1E808A3018227051493F2E73E1FC0FB37C7C5D4A46A7A749C451,
+        )
+        other = ECDSA(secp256r1, sha256)
+        other_signature = other.create_sign(b"another message")
+        items = [
+            (message.encode("utf-8"), signature, key_pair[1]),
+            (message.encode("utf-8") + b"!", signature, key_pair[1]),
+            (b"another message", other_signature, other.Q_U),
+            (message.encode("utf-8"), (0, signature[1]), key_pair[1]),
+            (b"another message", other_signature, key_pair[1]),
+            (message.encode("utf-8"), signature, key_pair[1]),
+        ]
+        self.assertListEqual(
+            ecdsa.verify_batch(items), [True, False, True, False, False, True]
+        )
+        self.assertListEqual(ecdsa.verify_batch([]), [])
+
+    def test_verify_infinity(self):
+        # Against the point at infinity, R = k * G for a signature forged with
+        # any k.
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        e = int(sha256(message.encode("utf-8")), 16)
+        k = 7
+        forged = ((k * G).x % secp256r1.n, e * pow(k, -1, secp256r1.n) % secp256r1.n)
+        infinity = CurvePoint.infinity(secp256r1)
+        verifier = ECDSA(secp256r1, sha256, (None, infinity))
+        self.assertFalse(verifier.verify_sign(message.encode("utf-8"), forged))
+        self.assertListEqual(
+            ecdsa.verify_batch([(message.encode("utf-8"), forged, infinity)]), [False]
+        )
 
     def test_sign(self):
         faulty = ECDSA(secp256r1, sha256, (None, key_pair[1]))
@@ -43,3 +80,39 @@ class TestECDSA(unittest.TestCase):
         hasher.update(message.encode("utf-8"))
         digest = hasher.finalize()
         public_key.verify(signature, digest, ec.ECDSA(utils.Prehashed(chosen_hash)))
+
+    def test_sign_deterministic(self):
+        # RFC 6979, A.2.5: ECDSA, 256 Bits (Prime Field), SHA-256
+        d = 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        signer = ECDSA(secp256r1, sha256, (d, d * G), deterministic=True)
+        self.assertEqual(
+            signer.create_sign(b"sample"),
+            (
+                0xEFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716,
+                0xF7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8,
+            ),
+        )
+        signer = ECDSA(secp256r1, lsh256, (d, d * G), deterministic=True)
+        signature = signer.create_sign(b"sample")
+        self.assertEqual(signer.create_sign(b"sample"), signature)
+        self.assertTrue(signer.verify_sign(b"sample", signature))
+
+    def test_sign_ladder(self):
+        signer = ECDSA(secp256r1, sha256, key_pair, ladder=True)
+        signature = signer.create_sign(message.encode("utf-8"))
+        self.assertTrue(ecdsa.verify_sign(message.encode("utf-8"), signature))
+        d, Q = ECDSA(secp256r1, sha256, ladder=True).create_key_pair()
+        self.assertEqual(Q, d * CurvePoint(secp256r1, pos=secp256r1.basepoint))
+
+    def test_sign_nonce_pool(self):
+        pool = NoncePool(secp256r1, size=4)
+        try:
+            signer = ECDSA(secp256r1, sha256, key_pair, nonce_pool=pool)
+            for _ in range(6):
+                signature = signer.create_sign(message.encode("utf-8"))
+                self.assertTrue(ecdsa.verify_sign(message.encode("utf-8"), signature))
+        finally:
+            pool.close()
+        with self.assertRaises(AssertionError):
+            ECDSA(secp256r1, sha256, key_pair, deterministic=True, nonce_pool=pool)
@@ -1,4 +1,13 @@
+import hashlib
+import hmac
+import os
+import shutil
+import subprocess
+import tempfile
 import unittest
+from unittest import mock
+from stack_processor import lsh256_backends
+from stack_processor.hashes import DigestCache, lsh256, lsh256_backend, sha256
 from stack_processor.lsh256 import LSHDigest
 
 
@@ -8,3 +17,102 @@ class TestLSH256Hash(unittest.TestCase):
             LSHDigest.digest(data=b"abc").hex(),
             "5fbf365daea5446a7053c52b57404d77a07a5f48a1f7c1963a0898ba1b714741",
         )
+
+    def test_hash_function(self):
+        digest = "5fbf365daea5446a7053c52b57404d77a07a5f48a1f7c1963a0898ba1b714741"
+        self.assertEqual(lsh256(b"abc"), digest)
+        self.assertEqual(lsh256.digest(b"abc"), bytes.fromhex(digest))
+        self.assertEqual(lsh256.digest_size, 32)
+
+    def test_hmac(self):
+        for key in (b"", b"key", b"k" * 200):
+            self.assertEqual(
+                sha256.hmac(key, b"message"),
+                hmac.new(key, b"message", hashlib.sha256).digest(),
+            )
+            self.assertEqual(len(lsh256.hmac(key, b"message")), 32)
+        self.assertEqual(lsh256.block_size, 128)
+
+    def test_digest_cache(self):
+        cache = DigestCache(maxsize=2, max_message=8)
+        self.assertEqual(cache(sha256, b"abc"), sha256(b"abc"))
+        self.assertEqual(cache(sha256, b"abc"), sha256(b"abc"))
+        self.assertEqual(cache(lsh256, b"abc"), lsh256(b"abc"))
+        cache(sha256, b"def")
+        self.assertIsNone(cache.lookup(sha256, b"abc"))
+        self.assertEqual(cache(sha256, b"long message"), sha256(b"long message"))
+        self.assertEqual(
+            cache.stats(), {"hits": 1, "misses": 4, "evictions": 1, "size": 2}
+        )
+
+
+class TestLSH256Backends(unittest.TestCase):
+    def test_selected(self):
+        self.assertIn(lsh256_backend, lsh256_backends.backend_names())
+        self.assertTrue(lsh256_backends.self_test(lsh256.digest))
+
+    def test_python(self):
+        digest = lsh256_backends.load_backend("python")
+        for length in (0, 55, 128, 300):
+            message = bytes(range(length % 256)) * (length // 256 + 1)
+            self.assertEqual(digest(message), bytes(LSHDigest.digest(data=message)))
+
+    def test_environment(self):
+        with mock.patch.dict(os.environ, {lsh256_backends.BACKEND_ENV: "reference"}):
+            name, _ = lsh256_backends.select_backend()
+        self.assertEqual(name, "reference")
+        with mock.patch.dict(os.environ, {lsh256_backends.BACKEND_ENV: "missing"}):
+            with self.assertRaises(ValueError):
+                lsh256_backends.select_backend()
+
+    def test_self_test(self):
+        self.assertFalse(lsh256_backends.self_test(lambda message: bytes(32)))
+        python = lsh256_backends.load_backend("python")
+        # Right for short messages only, as with a broken block boundary.
+        short_only = lambda m: python(m) if len(m) < 128 else bytes(32)
+        lsh256_backends.register_backend("short", lambda: short_only)
+        try:
+            with self.assertRaises(ValueError):
+                lsh256_backends.load_backend("short")
+        finally:
+            del lsh256_backends._backends["short"]
+        lsh256_backends.register_backend("broken", lambda: lambda m: bytes(32), True)
+        try:
+            self.assertEqual(lsh256_backends.backend_names()[0], "broken")
+            with self.assertRaises(ValueError):
+                lsh256_backends.load_backend("broken")
+            self.assertNotEqual(lsh256_backends.select_backend()[0], "broken")
+        finally:
+            del lsh256_backends._backends["broken"]
+
+    @unittest.skipIf(shutil.which("cc") is None, "no C compiler")
+    def test_native(self):
+        source = os.path.join(
+            os.path.dirname(lsh256_backends.__file__), "native", "lsh256.c"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            library = os.path.join(directory, "liblsh256.so")
+            subprocess.run(
+                ["cc", "-O2", "-shared", "-fPIC", "-o", library, source], check=True
+            )
+            empty = os.path.join(directory, "libempty.so")
+            subprocess.run(
+                ["cc", "-shared", "-fPIC", "-o", empty, "-x", "c", "-"],
+                input=b"int unrelated;\n",
+                check=True,
+            )
+            loaded = lsh256_backends._native_lib
+            try:
+                with mock.patch.dict(
+                    os.environ, {lsh256_backends.LIBRARY_ENV: library}
+                ):
+                    lsh256_backends._native_lib = None
+                    digest = lsh256_backends.load_backend("native")
+                self.assertTrue(lsh256_backends.self_test(digest))
+                # A library without the entry point is merely unavailable.
+                with mock.patch.dict(os.environ, {lsh256_backends.LIBRARY_ENV: empty}):
+                    lsh256_backends._native_lib = None
+                    with self.assertRaises(ValueError):
+                        lsh256_backends.load_backend("native")
+            finally:
+                lsh256_backends._native_lib = loaded
@@ -1,5 +1,10 @@
 import unittest
-from stack_processor.ecdsa.numbertheory import tonelli
+from stack_processor.ecdsa.numbertheory import (
+    batch_inv_mod,
+    inv_mod,
+    square_root,
+    tonelli,
+)
 
 
 class TestNumberTheory(unittest.TestCase):
@@ -10,3 +15,22 @@ class TestNumberTheory(unittest.TestCase):
             self.assertIn(tonelli(squared, p), (i, p - i))
         with self.assertRaises(AssertionError):
             tonelli(2, 3)
+
+    def test_square_root(self):
+        for p in (41, 43, 113):
+            sqrt = square_root(p)
+            for i in range(1, p):
+                squared = i ** 2 % p
+                self.assertIn(sqrt(squared), (i, p - i))
+            with self.assertRaises(AssertionError):
+                sqrt(3)
+
+    def test_batch_inv_mod(self):
+        p = 2 ** 255 - 19
+        values = [1, 2, 3, p - 1, 2 ** 200 + 7, 12345]
+        self.assertListEqual(
+            batch_inv_mod(values, p), [inv_mod(value, p) for value in values]
+        )
+        self.assertListEqual(batch_inv_mod([], p), [])
+        with self.assertRaises(ValueError):
+            batch_inv_mod([2, p, 3], p)
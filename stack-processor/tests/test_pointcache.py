@@ -0,0 +1,23 @@
+import unittest
+from stack_processor.ecdsa.curveparam import secp256r1
+from stack_processor.ecdsa.curvepoint import CurvePoint
+from stack_processor.ecdsa.pointcache import PointCache
+
+
+class TestPointCache(unittest.TestCase):
+    def test_get(self):
+        G = CurvePoint(secp256r1, pos=secp256r1.basepoint)
+        encodings = [bytes.fromhex((k * G).octet_str()) for k in range(2, 6)]
+        cache = PointCache(secp256r1, maxsize=2)
+        P = cache.get(encodings[0])
+        self.assertEqual(P, 2 * G)
+        self.assertIs(cache.get(encodings[0]), P)
+        cache.get(encodings[1])
+        cache.get(encodings[0])
+        cache.get(encodings[2])
+        self.assertIs(cache.get(encodings[0]), P)
+        self.assertEqual(
+            cache.stats(), {"hits": 3, "misses": 3, "evictions": 1, "size": 2}
+        )
+        with self.assertRaises(ValueError):
+            cache.get(b"\x05" + encodings[3][1:])
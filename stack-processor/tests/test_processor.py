@@ -1,7 +1,24 @@
+import io
+import re
 import unittest
 from base64 import b64encode, b64decode
-from stack_processor.processor import StackProcessor
+from stack_processor.processor import (
+    BudgetExceeded,
+    CostModel,
+    T_BOOL,
+    T_BYTES,
+    T_INT,
+    OP_ADD,
+    OP_DUP,
+    OP_INVALID,
+    OP_PUSH,
+    Program,
+    StackProcessor,
+)
+from stack_processor.ecdsa.curveparam import secp256r1
+from stack_processor.ecdsa.curvepoint import CurvePoint
 from stack_processor.hashes import lsh256, sha256
+from stack_processor.verification import PendingSig, resolve_deferred
 
 message = "Let Team Crypt0newbies win Crypto Contest 2021!"
 pubkey_base64 = (
@@ -13,6 +30,17 @@ signature_base64 = (
     "MEQCIEXkumF/HHJF5wcqFKaY3vNjKAEYIHAzbEC9SiMqcuaVAiAnOv1YYGQXPq1D"
     "V+AJ/Q8WYhLhSO7+z1sltk6usbzHCw=="
 )
+# A pay-to-pubkey-hash style script leaving [True], hashing with sha256.
+checksig = [
+    "bytes_utf8:" + message,
+    "sig:" + signature_base64,
+    "pubkey:" + pubkey_base64,
+    "OP_DUP",
+    "OP_HASH",
+    "bytes_utf8:" + sha256(pubkey_decoded),
+    "OP_EqualVerify",
+    "OP_CheckSig",
+]
 
 
 class TestStackProcessor(unittest.TestCase):
@@ -99,3 +127,169 @@ class TestStackProcessor(unittest.TestCase):
         )
         result = processor.run()
         self.assertListEqual(list(result), [False])
+
+    def test_compile(self):
+        program = StackProcessor.compile("1 0x2 ADD".split())
+        self.assertIsInstance(program, Program)
+        self.assertTupleEqual(
+            program.instructions, ((OP_PUSH, 1), (OP_PUSH, 2), (OP_ADD, None))
+        )
+        self.assertTupleEqual(
+            StackProcessor.compile(["NOP"]).instructions, ((OP_INVALID, "NOP"),)
+        )
+
+    def test_compiled_program_reuse(self):
+        program = StackProcessor.compile("1 OP_DUP 2 OP_EqualVerify 2".split())
+        for _ in range(2):
+            result = StackProcessor(program).run()
+            self.assertListEqual(list(result), [False])
+        program = StackProcessor.compile("1 2".split()) + StackProcessor.compile(
+            "ADD 3 EQUAL".split()
+        )
+        self.assertEqual(len(program), 5)
+        processor = StackProcessor(program)
+        self.assertListEqual(list(processor.run()), [True])
+        self.assertListEqual(list(processor.run()), [True])
+
+    def test_invalid_command(self):
+        processor = StackProcessor("1 NOP".split())
+        with self.assertRaises(KeyError):
+            processor.run()
+
+    def test_infinity_pubkey(self):
+        # Against the point at infinity, R = u1 * G, so anyone could sign.
+        n = secp256r1.n
+        e = int.from_bytes(sha256.digest(message.encode("utf-8")), "big")
+        k = 7
+        r = (k * CurvePoint(secp256r1, pos=secp256r1.basepoint)).x % n
+        forged = StackProcessor.Signature({"r": r, "s": e * pow(k, -1, n) % n})
+        script = [
+            "bytes_utf8:" + message,
+            "sig:" + b64encode(forged.dump()).decode("ascii"),
+            "pubkey:MAYwAAMCAAA=",
+            "OP_CheckSig",
+        ]
+        with self.assertRaises(ValueError):
+            StackProcessor(script, sha256).run()
+        stack = StackProcessor(script, sha256, deferred=True).run()
+        with self.assertRaises(ValueError):
+            resolve_deferred([stack], hash_func=sha256)
+
+    def test_deferred_checksig(self):
+        script = [
+            "bytes_utf8:" + message,
+            "sig:" + signature_base64,
+            "pubkey:" + pubkey_base64,
+            "OP_CheckSig",
+        ]
+        bad_script = ["bytes_utf8:" + message + "!"] + script[1:]
+        processors = [
+            StackProcessor(script, sha256, deferred=True),
+            StackProcessor(bad_script, sha256, deferred=True),
+        ]
+        stacks = [processor.run() for processor in processors]
+        self.assertIsInstance(stacks[0][0], PendingSig)
+        resolved = resolve_deferred(stacks, hash_func=sha256)
+        self.assertListEqual([list(stack) for stack in resolved], [[True], [False]])
+
+        # A result consumed by the script itself is verified eagerly.
+        processor = StackProcessor(script + ["OP_DUP", "ADD"], sha256, deferred=True)
+        self.assertListEqual(list(processor.run()), [2])
+        self.assertListEqual(processor.pending, [])
+
+    def test_stream(self):
+        tokens = iter("1 2 ADD 3 EQUAL".split())
+        processor = StackProcessor(tokens)
+        self.assertListEqual(list(processor.run()), [True])
+        self.assertIsNone(processor.program)
+        processor = StackProcessor(io.StringIO("1\nOP_DUP\n2\nOP_EqualVerify\n2\n"))
+        self.assertListEqual(list(processor.run()), [False])
+
+    def test_trace(self):
+        trace = []
+        processor = StackProcessor(
+            "1 OP_DUP ADD".split(),
+            trace=lambda instruction, stack: trace.append((instruction, list(stack))),
+        )
+        self.assertListEqual(list(processor.run()), [2])
+        self.assertListEqual(
+            trace,
+            [((OP_PUSH, 1), []), ((OP_DUP, None), [1]), ((OP_ADD, None), [1, 1])],
+        )
+        steps = StackProcessor("1 OP_DUP ADD".split()).steps()
+        self.assertListEqual(
+            [instruction for instruction, _ in steps],
+            [(OP_PUSH, 1), (OP_DUP, None), (OP_ADD, None)],
+        )
+
+    def test_analyze(self):
+        analysis = StackProcessor.compile(
+            checksig + ["1", "1", "EQUAL", "ADD", "bytes_utf8:a"]
+        ).analyze()
+        self.assertEqual(analysis.max_depth, 5)
+        self.assertTupleEqual(analysis.types, (T_INT, T_BYTES))
+        self.assertTupleEqual(
+            StackProcessor.compile("1 2 EQUAL".split()).analyze().types, (T_BOOL,)
+        )
+        for script, expected in [
+            ("1 ADD", "instruction 1 (ADD): stack underflow"),
+            ("1 bytes_utf8:a ADD", "instruction 2 (ADD): invalid operand types"),
+            ("1 OP_HASH", "instruction 1 (OP_HASH): invalid operand types int"),
+            ("1 NOP", "instruction 1: unknown command 'NOP'"),
+        ]:
+            with self.assertRaisesRegex(ValueError, re.escape(expected)):
+                StackProcessor.compile(script.split()).analyze()
+
+    def test_checked(self):
+        processor = StackProcessor("1 2 ADD".split(), checked=True)
+        self.assertListEqual(list(processor.run()), [3])
+        trace = []
+        processor = StackProcessor(
+            "1 2 ADD OP_HASH".split(),
+            checked=True,
+            trace=lambda instruction, stack: trace.append(instruction),
+        )
+        with self.assertRaises(ValueError):
+            processor.run()
+        self.assertListEqual(trace, [])
+        with self.assertRaises(TypeError):
+            StackProcessor(iter(["1"]), checked=True)
+
+    def test_equalverify_short_circuit(self):
+        trace = []
+        processor = StackProcessor(
+            "1 2 OP_EqualVerify 3 4".split(),
+            trace=lambda instruction, stack: trace.append(instruction),
+        )
+        self.assertListEqual(list(processor.run()), [False])
+        self.assertEqual(len(trace), 3)
+        processor = StackProcessor("1 2 OP_EqualVerify".split())
+        self.assertListEqual(list(processor.run()), [False])
+
+    def test_cost(self):
+        processor = StackProcessor("1 2 ADD".split())
+        processor.run()
+        self.assertEqual(processor.cost, 3)
+        processor = StackProcessor(["bytes_utf8:" + "a" * 200, "OP_HASH"], sha256)
+        processor.run()
+        self.assertEqual(processor.cost, 1 + 4 * CostModel().hash_block)
+        model = CostModel(weights=(1, 5, 1, 1, 1, 0, 100, 0), hash_block=1)
+        processor = StackProcessor("1 2 ADD".split(), cost_model=model)
+        processor.run()
+        self.assertEqual(processor.cost, 7)
+
+    def test_budget(self):
+        script = ["bytes_utf8:" + message, "sig:" + signature_base64]
+        script += ["pubkey:" + pubkey_base64, "OP_CheckSig"]
+        processor = StackProcessor(script, sha256, budget=30002)
+        with self.assertRaises(BudgetExceeded) as cm:
+            processor.run()
+        self.assertEqual(cm.exception.cost, 30003)
+        self.assertEqual(processor.cost, 30003)
+        processor = StackProcessor(script, sha256, budget=30003)
+        self.assertListEqual(list(processor.run()), [True])
+        processor = StackProcessor(
+            ["bytes_utf8:" + "a" * 64] + ["OP_DUP", "ADD"] * 40, budget=10000
+        )
+        with self.assertRaises(BudgetExceeded):
+            processor.run()
@@ -0,0 +1,61 @@
+import unittest
+from stack_processor.hashes import DigestCache, sha256
+from stack_processor.processor import StackProcessor
+from stack_processor.profiling import ExecutionStats
+from .test_processor import checksig, message, pubkey_base64, pubkey_decoded
+
+
+class TestExecutionStats(unittest.TestCase):
+    def test_profile(self):
+        stats = ExecutionStats()
+        processor = StackProcessor(checksig, sha256, profile=stats)
+        self.assertListEqual(list(processor.run()), [True])
+        result = stats.to_dict()
+        self.assertDictEqual(
+            {name: entry["count"] for name, entry in result["opcodes"].items()},
+            {
+                "PUSH": 4,
+                "OP_DUP": 1,
+                "OP_HASH": 1,
+                "OP_EqualVerify": 1,
+                "OP_CheckSig": 1,
+            },
+        )
+        self.assertEqual(result["max_depth"], 5)
+        self.assertEqual(result["hash_bytes"], len(pubkey_decoded))
+        self.assertEqual(result["sig_checks"], 1)
+        self.assertGreater(result["parse_time"], 0)
+        self.assertGreater(result["sig_time"], 0)
+
+    def test_callbacks(self):
+        class Recorder(ExecutionStats):
+            def __init__(self):
+                super().__init__()
+                self.names = []
+
+            def instruction(self, name, elapsed, depth):
+                super().instruction(name, elapsed, depth)
+                self.names.append(name)
+
+        recorder = Recorder()
+        StackProcessor(iter("1 2 ADD".split()), profile=recorder).run()
+        self.assertListEqual(recorder.names, ["PUSH", "PUSH", "ADD"])
+        total = ExecutionStats()
+        total.merge(recorder)
+        total.merge(recorder)
+        self.assertEqual(total.counts["PUSH"], 4)
+        self.assertEqual(total.max_depth, 2)
+
+    def test_digest_cache(self):
+        cache = DigestCache()
+        script = ["pubkey:" + pubkey_base64, "OP_HASH"] * 2
+        script += ["bytes_utf8:" + message, "OP_HASH"]
+        stats = ExecutionStats()
+        result = StackProcessor(script, sha256, profile=stats, digest_cache=cache).run()
+        digest = sha256(pubkey_decoded).encode("utf-8")
+        self.assertListEqual(list(result)[:2], [digest, digest])
+        self.assertEqual(stats.digest_hits, 1)
+        self.assertEqual(stats.digest_misses, 2)
+        self.assertEqual(stats.to_dict()["digest_hits"], 1)
+        StackProcessor(script, sha256, digest_cache=cache).run()
+        self.assertEqual(cache.hits, 4)
@@ -0,0 +1,59 @@
+import os
+import pickle
+import tempfile
+import unittest
+from stack_processor.processor import StackProcessor
+from stack_processor.script_cache import ScriptCache, script_key
+from stack_processor.hashes import sha256
+from .test_processor import checksig
+
+
+class TestScriptCache(unittest.TestCase):
+    def test_script_key(self):
+        self.assertEqual(script_key(["1", "2"]), script_key(iter(["1", "2"])))
+        self.assertNotEqual(script_key(["1", "2"]), script_key(["12"]))
+
+    def test_get(self):
+        cache = ScriptCache(maxsize=1)
+        program = cache.get("1 2 ADD".split())
+        self.assertIs(cache.get("1 2 ADD".split()), program)
+        self.assertListEqual(list(StackProcessor(program).run()), [3])
+        cache.get("1 OP_DUP".split())
+        self.assertIsNot(cache.get("1 2 ADD".split()), program)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hit_rate"], 0.25)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            program = ScriptCache(directory=directory).get("1 2 ADD".split())
+            cache = ScriptCache(directory=directory)
+            restored = cache.get("1 2 ADD".split())
+            self.assertTupleEqual(restored.instructions, program.instructions)
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+            self.assertEqual(cache.stats()["misses"], 0)
+
+    def test_disk_tier_stale(self):
+        class Stale:
+            def __reduce__(self):
+                return int, ("not a program",)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, script_key(["1"]) + ".pickle")
+            with open(path, "wb") as f:
+                pickle.dump(Stale(), f)
+            cache = ScriptCache(directory=directory)
+            self.assertListEqual(list(StackProcessor(cache.get(["1"])).run()), [1])
+            self.assertEqual(cache.stats()["misses"], 1)
+            reloaded = ScriptCache(directory=directory)
+            reloaded.get(["1"])
+            self.assertEqual(reloaded.stats()["disk_hits"], 1)
+
+    def test_disk_tier_der(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ScriptCache(directory=directory).get(checksig)
+            program = ScriptCache(directory=directory).get(checksig)
+            result = StackProcessor(program, sha256).run()
+            self.assertListEqual(list(result), [True])
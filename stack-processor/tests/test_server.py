@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from stack_processor.ecdsa.ecdsa import ECDSA
+from stack_processor.hashes import sha256
+from stack_processor.server import ScriptServer, load_test, open_connection, submit
+from .test_processor import checksig
+
+
+class TestScriptServer(unittest.TestCase):
+    def run_server(self, server: ScriptServer, client):
+        async def main():
+            listener = await server.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            try:
+                return await client(port)
+            finally:
+                listener.close()
+                await listener.wait_closed()
+
+        return asyncio.run(main())
+
+    def test_submit(self):
+        async def client(port):
+            reader, writer = await open_connection(port=port)
+            responses = [
+                await submit(reader, writer, checksig, "sig"),
+                await submit(reader, writer, "1 2 ADD".split(), 2),
+                await submit(reader, writer, "1 NOP".split()),
+            ]
+            writer.write(b"\x00\x00\x00\x01x")
+            responses.append(await submit(reader, writer, []))
+            writer.close()
+            return responses
+
+        with ScriptServer(sha256, max_workers=1) as server:
+            responses = self.run_server(server, client)
+        self.assertListEqual(
+            responses,
+            [
+                {"id": "sig", "stack": [True], "error": None, "cost": 36006},
+                {"id": 2, "stack": [3], "error": None, "cost": 3},
+                {
+                    "id": None,
+                    "stack": None,
+                    "error": "ValueError: instruction 1: unknown command 'NOP'",
+                    "cost": 0,
+                },
+                {
+                    "id": None,
+                    "stack": None,
+                    "error": "JSONDecodeError: Expecting value: line 1 column 1"
+                    " (char 0)",
+                    "cost": None,
+                },
+            ],
+        )
+
+    def test_consumed_checksig(self):
+        async def client(port):
+            reader, writer = await open_connection(port=port)
+            response = await submit(
+                reader, writer, checksig + ["1", "1", "EQUAL", "EQUAL"]
+            )
+            writer.close()
+            return response
+
+        verify_sign = ECDSA.verify_sign
+        threads = []
+
+        def spy(self, *args):
+            threads.append(threading.current_thread())
+            return verify_sign(self, *args)
+
+        with mock.patch.object(ECDSA, "verify_sign", spy):
+            with ScriptServer(sha256, max_workers=1) as server:
+                response = self.run_server(server, client)
+        self.assertListEqual(response["stack"], [True])
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    def test_timeout(self):
+        async def client(port):
+            reader, writer = await open_connection(port=port)
+            response = await submit(reader, writer, checksig)
+            writer.close()
+            return response
+
+        with ScriptServer(sha256, max_workers=1, timeout=0) as server:
+            response = self.run_server(server, client)
+            self.assertEqual(response["error"], "TimeoutError: deadline exceeded")
+            self.assertEqual(server.timeouts, 1)
+
+    def test_deadline(self):
+        # Every repetition verifies a signature eagerly, about 3 ms each.
+        slow = (checksig + ["1", "1", "EQUAL", "EQUAL"]) * 300
+
+        async def request(port, script, delay):
+            await asyncio.sleep(delay)
+            reader, writer = await open_connection(port=port)
+            response = await submit(reader, writer, script)
+            writer.close()
+            return response
+
+        async def client(port):
+            return await asyncio.gather(
+                request(port, slow, 0), request(port, "1 2 ADD".split(), 0.05)
+            )
+
+        with ScriptServer(sha256, max_workers=1, timeout=0.3, budget=None) as server:
+            responses = self.run_server(server, client)
+        self.assertEqual(responses[0]["error"], "TimeoutError: deadline exceeded")
+        self.assertListEqual(responses[1]["stack"], [3])
+
+    def test_load_test(self):
+        async def client(port):
+            return await load_test(checksig, requests=20, concurrency=4, port=port)
+
+        with ScriptServer(sha256, max_workers=1, max_pending=2) as server:
+            report = self.run_server(server, client)
+        self.assertEqual(report["requests"], 20)
+        self.assertEqual(report["errors"], 0)
+        self.assertLessEqual(report["p50"], report["p99"])
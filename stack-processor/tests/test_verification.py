@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+from base64 import b64decode
+from stack_processor.hashes import sha256
+from stack_processor.verification import (
+    PendingSig,
+    VerificationService,
+    resolve_deferred,
+)
+
+message = "Let Team Crypt0newbies win Crypto Contest 2021!".encode("utf-8")
+pubkey = b64decode(
+    "MFkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDQgAEl7iFfRl8gHaym4jl+JPFGOkFTJvu"
+    "qmvhwx+m6krYPoGiOjVvjGkCXaSEXtgPhUNNuKZTA1vul3/kvUa9ygX0vQ=="
+)[-65:]
+r = 0xE74013272166ED7216B81428E151C1F4196BCB16A442E590C63685839B32A8C9
+s = 0xD231C993EDCB1E808A3018227051493F2E73E1FC0FB37C7C5D4A46A7A749C451
+jobs = [
+    (message, r, s, pubkey),
+    (message + b"!", r, s, pubkey),
+    (message, r, 0, pubkey),
+] * 3
+
+
+class TestVerificationService(unittest.TestCase):
+    def test_map(self):
+        with VerificationService(hash_func=sha256, max_workers=2, chunksize=2) as pool:
+            self.assertListEqual(pool.map(jobs), [True, False, False] * 3)
+            self.assertListEqual(pool.map([]), [])
+
+    def test_bad_pubkey(self):
+        bad_pubkey = b"\x02" + (1).to_bytes(32, "big")
+        with VerificationService(hash_func=sha256, max_workers=1) as pool:
+            results = pool.map([jobs[0], (message, r, s, bad_pubkey), jobs[0]])
+            self.assertEqual(results[0::2], [True, True])
+            self.assertIsInstance(results[1], AssertionError)
+            placeholders = [
+                PendingSig((message, r, s, bad_pubkey)),
+                PendingSig(jobs[0]),
+            ]
+            with self.assertRaises(AssertionError):
+                resolve_deferred([placeholders], service=pool)
+            self.assertTrue(placeholders[1].result)
+            self.assertListEqual(
+                list(resolve_deferred([placeholders[1:]], service=pool)[0]), [True]
+            )
+
+    def test_verify(self):
+        with VerificationService(hash_func=sha256, max_workers=2, chunksize=2) as pool:
+            results = asyncio.run(pool.verify(jobs))
+        self.assertListEqual(results, [True, False, False] * 3)
+
+    def test_resolve_deferred(self):
+        placeholders = [PendingSig(job) for job in jobs[:3]]
+        stacks = [[1, placeholders[0]], placeholders[1:], [placeholders[0]]]
+        expected = [[1, True], [False, False], [True]]
+        with VerificationService(hash_func=sha256, max_workers=2, chunksize=2) as pool:
+            resolved = resolve_deferred(stacks, service=pool)
+        self.assertListEqual([list(stack) for stack in resolved], expected)